@@ -0,0 +1,285 @@
+import math
+import os
+import sys
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from pydantic import BaseModel, ValidationError
+
+# Make the shared `prediction` package (streamlit/prediction) importable
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit"))
+
+from prediction.admission import AdmissionController, Rejected, prometheus_metrics
+from prediction.artifacts import APARTMENT_MODEL_FILE, HOUSE_MODEL_FILE
+from prediction.audit import open_audit_log, prometheus_audit
+from prediction.bulk import BULK_FORMATS, bulk_format, predictions_table, read_table, table_to_frame, write_table
+from prediction.cache import open_model_cache, open_prediction_cache, prometheus_cache
+from prediction.models import load_pipeline, model_version
+from prediction.monitoring import drift_monitors, prometheus_drift
+from prediction.router import score_properties
+from prediction.service import score_apartments, score_houses
+from prediction.warmup import DEFAULT_BATCH_SIZES, Readiness, prometheus_warmup
+
+# ==============================
+# 1. App and Request Schema
+# ==============================
+@asynccontextmanager
+async def lifespan(app):
+    # Warm up in the background: the process answers liveness checks at once
+    # and reports ready on /ready when the models are loaded and exercised
+    batch_sizes = os.environ.get("WARMUP_BATCH_SIZES")
+    readiness.start(get_pipeline, [int(n) for n in batch_sizes.split(",")] if batch_sizes else DEFAULT_BATCH_SIZES)
+    yield
+    # Flush the audit records still queued before the process exits
+    audit_log.close()
+
+
+app = FastAPI(title="Immo Eliza Price Prediction API", lifespan=lifespan)
+
+
+class PredictionRequest(BaseModel):
+    # One dict per property, with the same fields as the Streamlit forms
+    # (plus `property_type` on the mixed /predict route)
+    data: list[dict]
+
+
+# The JSON routes parse the body themselves (see admitted_scoring); this keeps
+# its schema in the OpenAPI docs
+PREDICTION_REQUEST_DOCS = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": PredictionRequest.model_json_schema()}},
+    }
+}
+
+# ==============================
+# 2. Admission Control
+# ==============================
+# One controller per model, tuned through environment variables
+admission = {
+    model: AdmissionController(
+        max_in_flight=int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", 4)),
+        max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", 64)),
+        rate=float(os.environ.get("ADMISSION_RATE_PER_CLIENT", 20)),
+        burst=int(os.environ.get("ADMISSION_BURST_PER_CLIENT", 40)),
+        latency_budget=float(os.environ.get("ADMISSION_LATENCY_BUDGET_MS", 1000)) / 1000,
+    )
+    for model in ["apartment", "house", "property"]
+}
+# Bulk uploads take much longer per call, so they queue separately with their own budget
+admission.update({
+    f"{model}_bulk": AdmissionController(
+        max_in_flight=int(os.environ.get("ADMISSION_BULK_MAX_IN_FLIGHT", 1)),
+        max_queue=int(os.environ.get("ADMISSION_BULK_MAX_QUEUE", 8)),
+        rate=float(os.environ.get("ADMISSION_BULK_RATE_PER_CLIENT", 1)),
+        burst=int(os.environ.get("ADMISSION_BULK_BURST_PER_CLIENT", 5)),
+        latency_budget=float(os.environ.get("ADMISSION_BULK_LATENCY_BUDGET_MS", 60000)) / 1000,
+        initial_service_time=1.0,
+    )
+    for model in ["apartment", "house", "property"]
+})
+
+
+def client_id(http_request):
+    return http_request.headers.get("X-Client-Id") or (http_request.client.host if http_request.client else "anonymous")
+
+
+def latency_budget(http_request):
+    # Clients may tighten or relax the default budget per request
+    budget_ms = http_request.headers.get("X-Latency-Budget-Ms")
+    if budget_ms is None:
+        return None
+    try:
+        budget = float(budget_ms)
+    except ValueError:
+        budget = math.nan
+    if not math.isfinite(budget) or budget <= 0:
+        raise HTTPException(status_code=400, detail="X-Latency-Budget-Ms must be a positive number of milliseconds")
+    return budget / 1000
+
+
+@app.exception_handler(Rejected)
+async def rejected_handler(http_request, exc):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+# ==============================
+# 3. Model Loading and Scoring
+# ==============================
+@lru_cache(maxsize=None)
+def get_pipeline(file_name):
+    try:
+        return load_pipeline(file_name)
+    except FileNotFoundError:
+        return None
+
+
+def require_pipeline(file_name):
+    pipeline = get_pipeline(file_name)
+    if pipeline is None:
+        raise HTTPException(status_code=503, detail=f"Model {file_name} is not available")
+    return pipeline
+
+
+# Drift monitors per property type, the ones `score_apartments` and `score_houses` feed by default
+monitors = drift_monitors()
+
+# Every valuation is logged with its features, price and model version
+# (AUDIT_LOG_DIR), by the same log the Streamlit pages of a process write to
+audit_log = open_audit_log()
+MODEL_FILES = {"APARTMENT": APARTMENT_MODEL_FILE, "HOUSE": HOUSE_MODEL_FILE}
+
+# Flipped by the warm-up started in `lifespan`
+readiness = Readiness()
+
+# Optional on-disk cache shared by the workers of this node (PREDICTION_CACHE_PATH)
+prediction_cache = open_prediction_cache()
+caches = {kind: open_model_cache(model_version(file_name)) for kind, file_name in MODEL_FILES.items()}
+
+
+def score_apartment_batch(df):
+    return score_apartments(require_pipeline(APARTMENT_MODEL_FILE), df, cache=caches["APARTMENT"])
+
+
+def score_house_batch(df):
+    return score_houses(require_pipeline(HOUSE_MODEL_FILE), df, cache=caches["HOUSE"])
+
+
+def score_property_batch(df):
+    # A missing model only rejects the rows of that property type
+    pipelines = {kind: get_pipeline(file_name) for kind, file_name in MODEL_FILES.items()}
+    return score_properties(df, pipelines, caches=caches)
+
+
+SCORERS = {
+    "apartment": score_apartment_batch,
+    "house": score_house_batch,
+    "property": score_property_batch,
+}
+
+
+def run_scoring(model, body):
+    try:
+        request = PredictionRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False), body=body)
+    if not request.data:
+        raise HTTPException(status_code=422, detail="`data` must contain at least one property")
+
+    df = pd.DataFrame(request.data)
+    prices, messages = SCORERS[model](df)
+    return {
+        "predictions": [None if np.isnan(price) else round(float(price), 2) for price in prices],
+        "errors": [{"row": int(row), "message": message} for row, message in messages.items()],
+    }
+
+
+def run_bulk_scoring(model, body, request_format, response_format):
+    try:
+        table = read_table(body, request_format)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read the uploaded table: {e}")
+
+    ids, df = table_to_frame(table)
+    prices, messages = SCORERS[model](df)
+    return write_table(predictions_table(ids, prices, messages), response_format)
+
+
+async def admitted_scoring(model, http_request):
+    # Like the bulk routes, read and parse the body only once admitted
+    async with admission[model].admit(client_id(http_request), latency_budget(http_request)):
+        body = await http_request.body()
+        return await run_in_threadpool(run_scoring, model, body)
+
+
+async def admitted_bulk_scoring(model, http_request):
+    request_format = bulk_format(http_request.headers.get("Content-Type"))
+    if request_format is None:
+        raise HTTPException(status_code=415, detail=f"Upload the table as one of {', '.join(BULK_FORMATS)}")
+    # Answer in the requested format, or in the upload's format by default
+    response_format = bulk_format(http_request.headers.get("Accept")) or request_format
+
+    # Admit before reading the upload, so rate-limited and shed requests are
+    # turned away without their payload being buffered in memory
+    async with admission[f"{model}_bulk"].admit(client_id(http_request), latency_budget(http_request)):
+        body = await http_request.body()
+        content = await run_in_threadpool(run_bulk_scoring, model, body, request_format, response_format)
+    return Response(content=content, media_type=response_format)
+
+# ==============================
+# 4. Routes
+# ==============================
+@app.get("/")
+def alive():
+    return "alive"
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    active = {kind.lower(): monitor for kind, monitor in monitors.items() if monitor is not None}
+    return (
+        prometheus_metrics(admission)
+        + prometheus_drift(active)
+        + prometheus_audit(audit_log)
+        + prometheus_warmup(readiness)
+        + (prometheus_cache(prediction_cache) if prediction_cache is not None else "")
+    )
+
+
+@app.get("/ready")
+def ready():
+    # Readiness probe: 503 until the warm-up has finished, then its phase
+    # timings in ms; stays 503, with the error, when the warm-up failed
+    error = readiness.error
+    content = {
+        "ready": readiness.ready,
+        "warmup_ms": {phase: round(seconds * 1000, 1) for phase, seconds in readiness.timings.items()},
+        "error": f"{type(error).__name__}: {error}" if error is not None else None,
+    }
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=content)
+
+
+@app.get("/drift")
+def drift(min_rows: int = 100):
+    # PSI of live inputs and predictions against the training distribution
+    return {kind.lower(): monitor.scores(min_rows) for kind, monitor in monitors.items() if monitor is not None}
+
+
+@app.post("/predict", openapi_extra=PREDICTION_REQUEST_DOCS)
+async def predict_property(http_request: Request):
+    # Mixed houses and apartments, routed on each row's `property_type`
+    return await admitted_scoring("property", http_request)
+
+
+@app.post("/predict/apartment", openapi_extra=PREDICTION_REQUEST_DOCS)
+async def predict_apartment(http_request: Request):
+    return await admitted_scoring("apartment", http_request)
+
+
+@app.post("/predict/house", openapi_extra=PREDICTION_REQUEST_DOCS)
+async def predict_house(http_request: Request):
+    return await admitted_scoring("house", http_request)
+
+
+@app.post("/predict/bulk")
+async def predict_property_bulk(http_request: Request):
+    return await admitted_bulk_scoring("property", http_request)
+
+
+@app.post("/predict/apartment/bulk")
+async def predict_apartment_bulk(http_request: Request):
+    return await admitted_bulk_scoring("apartment", http_request)
+
+
+@app.post("/predict/house/bulk")
+async def predict_house_bulk(http_request: Request):
+    return await admitted_bulk_scoring("house", http_request)
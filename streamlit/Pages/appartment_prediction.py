@@ -1,8 +1,19 @@
 import streamlit as st
-import joblib
 import pandas as pd
 import numpy as np
 import os
+import sys
+import time
+
+# Make the shared `prediction` package importable when the page runs on its own
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction.artifacts import APARTMENT_MODEL_FILE
+from prediction.cache import MemoryCache, open_model_cache
+from prediction.evaluation import load_metrics
+from prediction.models import load_pipeline, model_version
+from prediction.service import score_apartments
+from prediction.validation import HEATING_TYPE_OPTIONS, STATE_BUILDING_OPTIONS
 
 # ==============================
 # 1. Set Page Configuration
@@ -14,19 +25,23 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Runs of the whole script and of the prediction panel, with the time spent
+# in the panel, under a key of this page's own; read by benchmarks/page_reruns.py
+RERUNS_KEY = "reruns_apartment"
+reruns = st.session_state.setdefault(RERUNS_KEY, {"page": 0, "panel": 0, "panel_seconds": 0.0})
+reruns["page"] += 1
+
 # ==============================
 # 2. Load the Trained Model and Metrics with Caching
 # ==============================
 @st.cache_resource
-def load_model_and_metrics(path):
+def load_model_and_metrics(file_name):
     try:
-        model_pipeline = joblib.load(path)
-        # Model performance metrics
-        model_metrics = {
-            "R_squared": 0.7078,   # R-squared 
-            "MAE": 38692.80,       # Mean Absolute Error 
-            "Median_AE": 25947.45, # Median Absolute Error 
-        }
+        # Loads the joblib or ONNX artifact, depending on PREDICTION_BACKEND
+        model_pipeline = load_pipeline(file_name)
+        # Cross-validated metrics in EUR, stored next to the artifact by
+        # `python -m prediction.evaluation` (None until it has been run for this artifact)
+        model_metrics = load_metrics(file_name)
         return model_pipeline, model_metrics
     except FileNotFoundError as e:
         st.error(f"File not found: {e}")
@@ -35,13 +50,8 @@ def load_model_and_metrics(path):
         st.error(f"An error occurred while loading the model: {e}")
         st.stop()
 
-model_path = "streamlit/Pages/Trained_Models/apartments_xgb_model_log.joblib"
-# Determine the absolute path to the model file
-current_dir = os.path.dirname(__file__)
-model_path = os.path.join(current_dir, "Trained_Models", "apartments_xgb_model_log.joblib")
-
 # Load the model and metrics
-model_pipeline, model_metrics = load_model_and_metrics(model_path)
+model_pipeline, model_metrics = load_model_and_metrics(APARTMENT_MODEL_FILE)
 
 # ==============================
 # 3. Apply Custom CSS Styling
@@ -116,192 +126,189 @@ st.write(
 st.markdown("---")
 
 # ==============================
-# 5. Define Helper Function to Map ZIP Code to Province
+# 5. Prediction through the Shared Scoring Path
 # ==============================
-def get_province_from_zip_code(zip_code):
-    try:
-        zip_int = int(zip_code)
-    except ValueError:
-        return None  # Invalid ZIP code format
+@st.cache_resource
+def prediction_cache(version):
+    # Repeated submissions of the same form skip the model, and are read from
+    # disk when PREDICTION_CACHE_PATH is set and another worker (or a previous
+    # run) already priced this apartment. A new model version gets a new cache.
+    return MemoryCache(backend=open_model_cache(version))
 
-    if 1000 <= zip_int <= 1299:
-        return "Brussels Capital Region"
-    elif 1300 <= zip_int <= 1499:
-        return "Walloon Brabant"
-    elif 1500 <= zip_int <= 1999 or 3000 <= zip_int <= 3499:
-        return "Flemish Brabant"
-    elif 2000 <= zip_int <= 2999:
-        return "Antwerp"
-    elif 3500 <= zip_int <= 3999:
-        return "Limburg"
-    elif 4000 <= zip_int <= 4999:
-        return "Liège"
-    elif 5000 <= zip_int <= 5999:
-        return "Namur"
-    elif 6000 <= zip_int <= 6599 or 7000 <= zip_int <= 7999:
-        return "Hainaut"
-    elif 6600 <= zip_int <= 6999:
-        return "Luxembourg"
-    elif 8000 <= zip_int <= 8999:
-        return "West Flanders"
-    elif 9000 <= zip_int <= 9992:
-        return "East Flanders"
-    else:
-        return None  # ZIP code not recognized
+
+def predict_price(version, inputs):
+    """
+    Validate and price one apartment with `score_apartments`, like the API,
+    so the valuation reaches the drift monitor. `inputs` is a tuple of
+    (field, value) pairs. Returns the price in EUR and an error message, one
+    of them None.
+    """
+    prices, messages = score_apartments(model_pipeline, pd.DataFrame([dict(inputs)]), cache=prediction_cache(version))
+    if np.isnan(prices[0]):
+        return None, messages.iloc[0]
+    return float(prices[0]), None
 
 # ==============================
-# 6. Collect User Input via Streamlit Form
+# 6. Input Form and Result Panel
 # ==============================
-with st.form(key='prediction_form'):
-    # Organize inputs in three columns for a compact layout
-    col1, col2, col3 = st.columns([1, 1, 1])
+def prediction_form():
+    with st.form(key='prediction_form'):
+        # Organize inputs in three columns for a compact layout
+        col1, col2, col3 = st.columns([1, 1, 1])
 
-    with col1:
-        zip_code = st.text_input(
-            "📍 ZIP Code",
-            "1000",
-            help="Enter the 4-digit Belgian ZIP Code of the appartment."
-        )
-        total_area_sqm = st.number_input(
-            "📐 Total Area (sqm)",
-            min_value=10,
-            max_value=500,
-            value=75,
-            step=1,
-            help="Enter the total area of the appartment in square meters."
-        )
-        nbr_bedrooms = st.number_input(
-            "🛏️ Number of Bedrooms",
-            min_value=0,
-            max_value=10,
-            value=2,
-            step=1,
-            help="Enter the number of bedrooms."
-        )
+        with col1:
+            zip_code = st.text_input(
+                "📍 ZIP Code",
+                "1000",
+                help="Enter the 4-digit Belgian ZIP Code of the appartment."
+            )
+            total_area_sqm = st.number_input(
+                "📐 Total Area (sqm)",
+                min_value=10,
+                max_value=500,
+                value=75,
+                step=1,
+                help="Enter the total area of the appartment in square meters."
+            )
+            nbr_bedrooms = st.number_input(
+                "🛏️ Number of Bedrooms",
+                min_value=0,
+                max_value=10,
+                value=2,
+                step=1,
+                help="Enter the number of bedrooms."
+            )
 
-    with col2:
-        terrace_sqm = st.number_input(
-            "🏞️ Terrace Area (sqm)",
-            min_value=0,
-            max_value=100,
-            value=0,
-            step=1,
-            help="Enter the terrace area in square meters (if any)."
-        )
-        construction_year = st.number_input(
-            "🏗️ Construction Year",
-            min_value=1900,
-            max_value=2024,
-            value=2000,
-            step=1,
-            help="Enter the year the appartment was constructed."
-        )
-        state_building = st.selectbox(
-            "🏢 State of Building",
-            options=["NEW", "GOOD", "JUST RENOVATED", "TO RENOVATE", "TO RESTORE", "OTHER"],
-            index=1,
-            help="Select the current state of the building."
-        )
+        with col2:
+            terrace_sqm = st.number_input(
+                "🏞️ Terrace Area (sqm)",
+                min_value=0,
+                max_value=100,
+                value=0,
+                step=1,
+                help="Enter the terrace area in square meters (if any)."
+            )
+            construction_year = st.number_input(
+                "🏗️ Construction Year",
+                min_value=1900,
+                max_value=2024,
+                value=2000,
+                step=1,
+                help="Enter the year the appartment was constructed."
+            )
+            state_building = st.selectbox(
+                "🏢 State of Building",
+                options=STATE_BUILDING_OPTIONS,
+                index=1,
+                help="Select the current state of the building."
+            )
 
-    with col3:
-        heating_type = st.selectbox(
-            "🔥 Heating Type",
-            options=["GAS", "ELECTRIC", "CENTRAL", "WOOD", "SOLAR", "OTHER"],
-            index=0,
-            help="Select the type of heating available."
-        )
-        fl_furnished_input = st.radio(
-            "🛋️ Is the appartment furnished?",
-            options=["Yes", "No"],
-            index=1,
-            horizontal=True,
-            help="Indicate whether the appartment is furnished."
-        )
-        fl_double_glazing_input = st.radio(
-            "🌞 Has Double Glazing?",
-            options=["Yes", "No"],
-            index=0,
-            horizontal=True,
-            help="Indicate whether the appartment has double glazing."
-        )
+        with col3:
+            heating_type = st.selectbox(
+                "🔥 Heating Type",
+                options=HEATING_TYPE_OPTIONS,
+                index=0,
+                help="Select the type of heating available."
+            )
+            fl_furnished_input = st.radio(
+                "🛋️ Is the appartment furnished?",
+                options=["Yes", "No"],
+                index=1,
+                horizontal=True,
+                help="Indicate whether the appartment is furnished."
+            )
+            fl_double_glazing_input = st.radio(
+                "🌞 Has Double Glazing?",
+                options=["Yes", "No"],
+                index=0,
+                horizontal=True,
+                help="Indicate whether the appartment has double glazing."
+            )
 
-    # Center the submit button using custom CSS
-    st.markdown("<div class='center'>", unsafe_allow_html=True)
-    submit_button = st.form_submit_button(label='🔍 Predict Price')
-    st.markdown("</div>", unsafe_allow_html=True)
+        # Center the submit button using custom CSS
+        st.markdown("<div class='center'>", unsafe_allow_html=True)
+        submit_button = st.form_submit_button(label='🔍 Predict Price')
+        st.markdown("</div>", unsafe_allow_html=True)
 
-# ==============================
-# 7. Process Form Submission and Make Predictions
-# ==============================
-if submit_button:
-    # Validate ZIP code input
-    zip_code = zip_code.strip()
-    if not (zip_code.isdigit() and len(zip_code) == 4):
-        st.error("❌ Please enter a valid 4-digit Belgian ZIP Code.")
-    else:
-        # Determine province based on ZIP code
-        province = get_province_from_zip_code(zip_code)
-        if province is None:
-            st.error("❌ ZIP Code not recognized. Please enter a valid Belgian ZIP Code.")
-        else:
-            # Map "Yes"/"No" to 1/0 for binary features
-            fl_furnished = 1 if fl_furnished_input == "Yes" else 0
-            fl_double_glazing = 1 if fl_double_glazing_input == "Yes" else 0
+    if not submit_button:
+        return
 
-            # Determine if there's a terrace based on terrace_sqm
-            fl_terrace = 1 if terrace_sqm > 0 else 0
+    # Map "Yes"/"No" to 1/0 for binary features
+    fl_furnished = 1 if fl_furnished_input == "Yes" else 0
+    fl_double_glazing = 1 if fl_double_glazing_input == "Yes" else 0
 
-            # Prepare the input data dictionary
-            data = {
-                "total_area_sqm": total_area_sqm,
-                "construction_year": construction_year,
-                "nbr_bedrooms": nbr_bedrooms,
-                "terrace_sqm": terrace_sqm,
-                "state_building": state_building.upper(),
-                "zip_code": zip_code,
-                "province": province.upper(),
-                "heating_type": heating_type.upper(),
-                "fl_furnished": fl_furnished,
-                "fl_terrace": fl_terrace,
-                "fl_double_glazing": fl_double_glazing
-            }
+    # Determine if there's a terrace based on terrace_sqm
+    fl_terrace = 1 if terrace_sqm > 0 else 0
 
-            # Convert data to DataFrame for prediction
-            input_df = pd.DataFrame([data])
+    # Prepare the input data as (field, value) pairs
+    inputs = (
+        ("total_area_sqm", total_area_sqm),
+        ("construction_year", construction_year),
+        ("nbr_bedrooms", nbr_bedrooms),
+        ("terrace_sqm", terrace_sqm),
+        ("state_building", state_building.upper()),
+        ("zip_code", zip_code.strip()),
+        ("heating_type", heating_type.upper()),
+        ("fl_furnished", fl_furnished),
+        ("fl_terrace", fl_terrace),
+        ("fl_double_glazing", fl_double_glazing),
+    )
+
+    try:
+        predicted_price, error = predict_price(model_version(APARTMENT_MODEL_FILE), inputs)
+    except Exception as e:
+        st.error(f"❌ Prediction failed: {e}")
+        st.write("Please check the input values and try again.")
+        return
+    if error:
+        st.error(f"❌ {error}.")
+        return
 
-            # Make prediction and convert back from log scale to EUR
-            try:
-                # Make prediction using the loaded pipeline
-                pred_log = model_pipeline.predict(input_df)
-                predicted_price = np.expm1(pred_log)[0]  # Apply expm1 to get the original price
+    # Display prediction with formatting
+    st.success("🎉 **Prediction successful!**")
+    st.subheader("💰 Predicted Price")
+    st.write(f"The estimated price of the appartment is: **€{predicted_price:,.2f}**")
 
-                # Display prediction with formatting
-                st.success("🎉 **Prediction successful!**")
-                st.subheader("💰 Predicted Price")
-                st.write(f"The estimated price of the appartment is: **€{predicted_price:,.2f}**")
+    # Add model performance metrics
+    st.markdown("### 📊 Model Performance Metrics")
+    if model_metrics is None:
+        st.write("Metrics have not been computed for this model version yet.")
+    else:
+        overall = model_metrics["overall"]
+        st.write(f"- **R² Score:** {overall['r2']:.4f}")
+        st.write(f"- **Mean Absolute Error (MAE):** €{overall['mae']:,.2f}")
+        st.write(f"- **Median Absolute Error:** €{overall['median_ae']:,.2f}")
+        st.caption(f"{model_metrics['folds']}-fold cross-validation on {overall['rows']:,} listings.")
+
+    # Add model explanation
+    st.markdown("### 🤖 About the Model")
+    st.write("""
+        This prediction is made using an **XGBoost** regression model. During the model selection process, 
+        multiple algorithms were evaluated, including Linear Regression, Random Forest, and XGBoost. The 
+        **XGBoost model delivered the best results**, achieving higher accuracy and better performance metrics 
+        compared to the others. XGBoost (Extreme Gradient Boosting) is an advanced implementation of gradient 
+        boosting that is optimized for speed and performance, making it a popular choice for machine learning 
+        tasks involving structured data.
+    """)
+
+
+# A fragment: submitting the form reruns only this function, not the CSS,
+# header and footer, which are rendered once when the page loads
+@st.fragment
+def prediction_panel():
+    started = time.perf_counter()
+    try:
+        prediction_form()
+    finally:
+        reruns = st.session_state[RERUNS_KEY]
+        reruns["panel"] += 1
+        reruns["panel_seconds"] += time.perf_counter() - started
 
-                # Add model performance metrics
-                st.markdown("### 📊 Model Performance Metrics")
-                st.write(f"- **R² Score:** {model_metrics['R_squared']:.4f}")
-                st.write(f"- **Mean Absolute Error (MAE):** €{model_metrics['MAE']:,.2f}")
-                st.write(f"- **Median Absolute Error:** €{model_metrics['Median_AE']:,.2f}")
 
-                # Add model explanation
-                st.markdown("### 🤖 About the Model")
-                st.write("""
-                    This prediction is made using an **XGBoost** regression model. During the model selection process, 
-                    multiple algorithms were evaluated, including Linear Regression, Random Forest, and XGBoost. The 
-                    **XGBoost model delivered the best results**, achieving higher accuracy and better performance metrics 
-                    compared to the others. XGBoost (Extreme Gradient Boosting) is an advanced implementation of gradient 
-                    boosting that is optimized for speed and performance, making it a popular choice for machine learning 
-                    tasks involving structured data.
-                """)
-            except Exception as e:
-                st.error(f"❌ Prediction failed: {e}")
-                st.write("Please check the input values and try again.")
+prediction_panel()
 
 # ==============================
-# 8. Add Footer with Project Information
+# 7. Add Footer with Project Information
 # ==============================
 st.markdown(
     """
@@ -1,9 +1,20 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
-import json
 import os
+import sys
+import time
+
+# Make the shared `prediction` package importable when the page runs on its own
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction.artifacts import HOUSE_MODEL_FILE
+from prediction.cache import MemoryCache, open_model_cache
+from prediction.evaluation import load_metrics
+from prediction.models import load_pipeline, model_version
+from prediction.service import score_houses
+from prediction.validation import HEATING_TYPE_OPTIONS, STATE_BUILDING_OPTIONS
+from prediction.zip_codes import load_zip_table, lookup_zip_codes, provinces_from_zip_codes
 
 def run():
     pass
@@ -18,195 +29,200 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Runs of the whole script and of the prediction panel, with the time spent
+# in the panel, under a key of this page's own; read by benchmarks/page_reruns.py
+RERUNS_KEY = "reruns_house"
+reruns = st.session_state.setdefault(RERUNS_KEY, {"page": 0, "panel": 0, "panel_seconds": 0.0})
+reruns["page"] += 1
+
 # ==============================
 # 2. Load the Trained Model and Metrics
 # ==============================
 @st.cache_resource
-def load_model_and_metrics(path):
-    if not os.path.exists(path):
-        st.error(f"❌ Model file not found at: {path}")
-        st.stop()
+def load_model_and_metrics(file_name):
     try:
-        model_pipeline = joblib.load(path)
-        # Model performance metrics (hardcoded for now)
-        model_metrics = {
-            "R_squared": 0.7352,
-            "MAE": 45213.67,
-            "Median_AE": 31548.32,
-        }
+        # Loads the joblib or ONNX artifact, depending on PREDICTION_BACKEND
+        model_pipeline = load_pipeline(file_name)
+        # Cross-validated metrics in EUR, stored next to the artifact by
+        # `python -m prediction.evaluation` (None until it has been run for this artifact)
+        model_metrics = load_metrics(file_name)
         return model_pipeline, model_metrics
+    except FileNotFoundError as e:
+        st.error(f"❌ {e}")
+        st.stop()
     except Exception as e:
         st.error(f"❌ An error occurred while loading the model: {e}")
         st.stop()
 
-current_dir = os.path.dirname(__file__)
-model_path = os.path.join(current_dir, "Trained_Models", "price_prediction_pipeline.joblib")
-model_pipeline, model_metrics = load_model_and_metrics(model_path)
+model_pipeline, model_metrics = load_model_and_metrics(HOUSE_MODEL_FILE)
 
 # ==============================
 # 3. Load ZIP Code Reference Data
 # ==============================
-@st.cache_data
+@st.cache_resource
 def load_zip_code_reference():
     try:
-        current_dir = os.path.abspath(os.path.dirname(__file__))
-        zip_file_path = os.path.join(current_dir, "Trained_Models", "zipcode-belgium.json")
-        if not os.path.exists(zip_file_path):
-            raise FileNotFoundError(f"ZIP code file not found at: {zip_file_path}")
-        with open(zip_file_path, "r") as f:
-            zip_code_data = json.load(f)
-        return {entry["zip"]: entry for entry in zip_code_data}
+        return load_zip_table()
     except Exception as e:
         st.error(f"❌ Error loading ZIP code reference data: {e}")
         st.stop()
 
-zip_code_mapping = load_zip_code_reference()
-
-def get_zip_code_details(zip_code):
-    details = zip_code_mapping.get(zip_code, {"city": "Unknown", "lat": 0, "lng": 0})
-    return details["city"], details["lat"], details["lng"]
-
-def get_province_from_zip(zip_code):
-    try:
-        zip_int = int(zip_code)
-    except ValueError:
-        return "Unknown"
-    if 1000 <= zip_int <= 1299:
-        return "Brussels Capital Region"
-    elif 1300 <= zip_int <= 1499:
-        return "Walloon Brabant"
-    elif 1500 <= zip_int <= 1999 or 3000 <= zip_int <= 3499:
-        return "Flemish Brabant"
-    elif 2000 <= zip_int <= 2999:
-        return "Antwerp"
-    elif 3500 <= zip_int <= 3999:
-        return "Limburg"
-    elif 4000 <= zip_int <= 4999:
-        return "Liège"
-    elif 5000 <= zip_int <= 5999:
-        return "Namur"
-    elif 6000 <= zip_int <= 6599 or 7000 <= zip_int <= 7999:
-        return "Hainaut"
-    elif 6600 <= zip_int <= 6999:
-        return "Luxembourg"
-    elif 8000 <= zip_int <= 8999:
-        return "West Flanders"
-    elif 9000 <= zip_int <= 9992:
-        return "East Flanders"
-    else:
-        return "Unknown"
+zip_code_table = load_zip_code_reference()
 
 # ==============================
-# 4. User Input Form
+# 4. Page Header
 # ==============================
 st.title("🏠 House Price Prediction in Belgium")
 st.write(
     "Welcome to the House Price Prediction page! Fill in the details below to get an estimated price for your house."
 )
 
-with st.form(key="prediction_form"):
-    st.markdown("### Property Information")
-    col1, col2, col3 = st.columns([1, 1, 1])
-
-    with col1:
-        zip_code = st.text_input(
-            "📍 ZIP Code", 
-            "1000", 
-            help="Enter the 4-digit Belgian ZIP Code of the house."
-        )
-        total_area_sqm = st.number_input(
-            "📐 Total Area (sqm)", 
-            min_value=10, 
-            max_value=1000, 
-            value=150, 
-            step=1
-        )
-        nbr_bedrooms = st.number_input(
-            "🛏️ Number of Bedrooms", 
-            min_value=0, 
-            max_value=10, 
-            value=3, 
-            step=1
-        )
-
-    with col2:
-        construction_year = st.number_input(
-            "🏗️ Construction Year", 
-            min_value=1900, 
-            max_value=2024, 
-            value=2000, 
-            step=1
-        )
-        state_building = st.selectbox(
-            "🏢 State of Building", 
-            options=["NEW", "GOOD", "JUST RENOVATED", "TO RENOVATE", "TO RESTORE", "OTHER"]
-        )
-        garden_sqm = st.number_input(
-            "🌳 Garden Area (sqm)", 
-            min_value=0, 
-            max_value=2000, 
-            value=50, 
-            step=1
-        )
-
-    with col3:
-        heating_type = st.selectbox(
-            "🔥 Heating Type", 
-            options=["GAS", "ELECTRIC", "CENTRAL", "WOOD", "SOLAR", "OTHER"]
-        )
-
-    submit_button = st.form_submit_button(label="🔍 Predict Price")
+# ==============================
+# 5. Prediction through the Shared Scoring Path
+# ==============================
+@st.cache_resource
+def prediction_cache(version):
+    # Repeated submissions of the same form skip the model, and are read from
+    # disk when PREDICTION_CACHE_PATH is set and another worker (or a previous
+    # run) already priced this house. A new model version gets a new cache.
+    return MemoryCache(backend=open_model_cache(version))
+
+
+def predict_price(version, inputs):
+    """
+    Validate, enrich and price one house with `score_houses`, like the API,
+    so the valuation reaches the process-wide observers. `inputs` is a tuple
+    of (field, value) pairs. Returns the price in EUR, the city and province,
+    and an error message (None when the prediction succeeded).
+    """
+    input_df = pd.DataFrame([dict(inputs)])
+    prices, messages = score_houses(model_pipeline, input_df, cache=prediction_cache(version))
+    if np.isnan(prices[0]):
+        return None, None, None, messages.iloc[0]
+
+    # Location shown next to the price
+    city_name = lookup_zip_codes(input_df["zip_code"], zip_code_table)["city"][0]
+    province = provinces_from_zip_codes(input_df["zip_code"])[0]
+    return float(prices[0]), city_name, province, None
 
 # ==============================
-# 5. Process Form Submission and Make Predictions
+# 6. Input Form and Result Panel
 # ==============================
-if submit_button:
-    zip_code = zip_code.strip()
-    city_name, latitude, longitude = get_zip_code_details(zip_code)
-    province = get_province_from_zip(zip_code)
+def prediction_form():
+    with st.form(key="prediction_form"):
+        st.markdown("### Property Information")
+        col1, col2, col3 = st.columns([1, 1, 1])
+
+        with col1:
+            zip_code = st.text_input(
+                "📍 ZIP Code", 
+                "1000", 
+                help="Enter the 4-digit Belgian ZIP Code of the house."
+            )
+            total_area_sqm = st.number_input(
+                "📐 Total Area (sqm)", 
+                min_value=10, 
+                max_value=1000, 
+                value=150, 
+                step=1
+            )
+            nbr_bedrooms = st.number_input(
+                "🛏️ Number of Bedrooms", 
+                min_value=0, 
+                max_value=10, 
+                value=3, 
+                step=1
+            )
+
+        with col2:
+            construction_year = st.number_input(
+                "🏗️ Construction Year", 
+                min_value=1900, 
+                max_value=2024, 
+                value=2000, 
+                step=1
+            )
+            state_building = st.selectbox(
+                "🏢 State of Building", 
+                options=STATE_BUILDING_OPTIONS
+            )
+            garden_sqm = st.number_input(
+                "🌳 Garden Area (sqm)", 
+                min_value=0, 
+                max_value=2000, 
+                value=50, 
+                step=1
+            )
+
+        with col3:
+            heating_type = st.selectbox(
+                "🔥 Heating Type", 
+                options=HEATING_TYPE_OPTIONS
+            )
+
+        submit_button = st.form_submit_button(label="🔍 Predict Price")
+
+    if not submit_button:
+        return
+
+    inputs = (
+        ("zip_code", zip_code.strip()),
+        ("total_area_sqm", total_area_sqm),
+        ("nbr_bedrooms", nbr_bedrooms),
+        ("construction_year", construction_year),
+        ("state_building", state_building.upper()),
+        ("garden_sqm", garden_sqm),
+        ("heating_type", heating_type.upper()),
+        ("terrace_sqm", 0),
+        ("fl_terrace", 0),
+        ("fl_floodzone", 0),
+    )
 
-    if city_name == "Unknown":
-        st.error("❌ Invalid ZIP Code. Please enter a valid 4-digit Belgian ZIP Code.")
+    try:
+        pred_price, city_name, province, error = predict_price(model_version(HOUSE_MODEL_FILE), inputs)
+    except Exception as e:
+        st.error(f"❌ Prediction failed: {e}")
+        return
+    if error:
+        st.error(f"❌ {error}.")
+        return
+
+    st.success("🎉 Prediction successful!")
+    st.subheader("💰 Predicted Price")
+    st.write(f"The estimated price is: **€{pred_price:,.2f}**")
+
+    st.markdown("### 🌍 Property Location")
+    st.write(f"- **City:** {city_name}")
+    st.write(f"- **Province:** {province}")
+
+    st.markdown("### 📊 Model Metrics")
+    if model_metrics is None:
+        st.write("Metrics have not been computed for this model version yet.")
     else:
-        input_data = {
-            "zip_code": zip_code,
-            "province": province,
-            "total_area_sqm": total_area_sqm,
-            "nbr_bedrooms": nbr_bedrooms,
-            "construction_year": construction_year,
-            "state_building": state_building.upper(),
-            "latitude": latitude,
-            "longitude": longitude,
-            "garden_sqm": garden_sqm,
-            "heating_type": heating_type.upper(),
-            "terrace_sqm": 0,
-            "fl_terrace": 0,
-            "fl_floodzone": 0,
-        }
-
-        input_df = pd.DataFrame([input_data])
-
-        try:
-            pred_price = model_pipeline.predict(input_df)
-
-            st.success("🎉 Prediction successful!")
-            st.subheader("💰 Predicted Price")
-            st.write(f"The estimated price is: **€{pred_price[0]:,.2f}**")
-
-            st.markdown("### 🌍 Property Location")
-            st.write(f"- **City:** {city_name}")
-            st.write(f"- **Province:** {province}")
-
-            st.markdown("### 📊 Model Metrics")
-            st.write(f"- **R²:** {model_metrics['R_squared']:.4f}")
-            st.write(f"- **Mean Absolute Error (MAE):** €{model_metrics['MAE']:,.2f}")
-            st.write(f"- **Median Absolute Error (Median AE):** €{model_metrics['Median_AE']:,.2f}")
-
-        except Exception as e:
-            st.error(f"❌ Prediction failed: {e}")
+        overall = model_metrics["overall"]
+        st.write(f"- **R²:** {overall['r2']:.4f}")
+        st.write(f"- **Mean Absolute Error (MAE):** €{overall['mae']:,.2f}")
+        st.write(f"- **Median Absolute Error (Median AE):** €{overall['median_ae']:,.2f}")
+        st.caption(f"{model_metrics['folds']}-fold cross-validation on {overall['rows']:,} listings.")
+
+
+# A fragment: submitting the form reruns only this function, not the header
+# and footer, which are rendered once when the page loads
+@st.fragment
+def prediction_panel():
+    started = time.perf_counter()
+    try:
+        prediction_form()
+    finally:
+        reruns = st.session_state[RERUNS_KEY]
+        reruns["panel"] += 1
+        reruns["panel_seconds"] += time.perf_counter() - started
+
+
+prediction_panel()
 
 # ==============================
-# 6. Add Footer with Project Information
+# 7. Add Footer with Project Information
 # ==============================
 st.markdown(
     """
@@ -1,6 +1,21 @@
 import streamlit as st
 import os
+import sys
 import pandas as pd
+import pydeck as pdk
+
+# Make the shared `prediction` package importable when the page runs on its own
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, HOUSE_MODEL_FILE
+from prediction.evaluation import load_metrics
+from prediction.models import model_version
+from prediction.price_map import (
+    APARTMENT_HOLDOUT_FILE,
+    APARTMENT_PRICE_MAP_FILE,
+    REFERENCE_APARTMENT,
+    load_table,
+)
 
 # ==============================
 # 1. Set Page Configuration
@@ -24,6 +39,23 @@ def get_file_path(file_name):
 
 scatter_plot_file = get_file_path("scatter_plot_properties_belgium.png")
 
+
+@st.cache_data
+def load_report_table(file_name):
+    """
+    Load a table precomputed by `python -m prediction.price_map`, with the
+    model version it was computed with, or (None, None) when it is missing or
+    was computed for another version of the apartment model.
+    """
+    try:
+        table, version = load_table(file_name)
+    except FileNotFoundError:
+        return None, None
+    # Like the metrics, the tables describe the joblib artifact
+    if version != model_version(APARTMENT_MODEL_FILE, "joblib"):
+        return None, None
+    return table, version
+
 # ==============================
 # 3. Page Header
 # ==============================
@@ -35,7 +67,7 @@ st.markdown(
 )
 
 # ==============================
-# 6. Model Overview
+# 4. Model Overview
 # ==============================
 st.markdown("---")
 st.markdown("### 🤖 How the Models Work")
@@ -60,46 +92,116 @@ st.markdown(
 )
 
 # ==============================
-# 4. Prediction Comparison Table
+# 5. Prediction Comparison Table
 # ==============================
 st.markdown("---")
 st.markdown("### 🔍 Prediction Results: Sample Comparison")
 
-# Define the comparison data
-comparison_data = {
-    "Actual Price (€)": [265000.0, 200000.0, 334900.0, 172000.0, 449000.0, 274000.0, 297500.0, 199000.0, 252000.0, 300000.0],
-    "Predicted Price (€)": [326813.91, 226631.97, 355548.50, 214333.75, 345326.91, 258050.78, 350320.75, 186682.30, 253952.44, 348446.19],
-    "Absolute Error (€)": [61813.91, 26631.97, 20648.50, 42333.75, 103673.09, 15949.22, 52820.75, 12317.70, 1952.44, 48446.19],
-    "Percentage Error (%)": [23.33, 13.32, 6.17, 24.61, 23.09, 5.82, 17.75, 6.19, 0.77, 16.15],
-}
-
-# Display the comparison table
-comparison_df = pd.DataFrame(comparison_data)
-st.dataframe(comparison_df, use_container_width=True)
+holdout, holdout_version = load_report_table(APARTMENT_HOLDOUT_FILE)
+if holdout is None:
+    st.warning("⚠️ Held-out predictions not built for this model version. Run `python -m prediction.price_map` from the `streamlit` directory.")
+else:
+    st.write(
+        f"Apartment model predictions on {len(holdout):,} listings held out from training "
+        f"(the notebook's 20% test split, model `{holdout_version}`)."
+    )
+    comparison_df = pd.DataFrame({
+        "ZIP Code": holdout["zip_code"],
+        "Actual Price (€)": holdout["actual_price"],
+        "Predicted Price (€)": holdout["predicted_price"].round(2),
+        "Absolute Error (€)": holdout["absolute_error"].round(2),
+        "Percentage Error (%)": holdout["percentage_error"].round(2),
+    })
+    # Display a sample of the comparison, with every held-out listing one click away
+    st.dataframe(comparison_df.head(10), use_container_width=True, hide_index=True)
+    with st.expander(f"Show all {len(holdout):,} held-out listings"):
+        st.dataframe(comparison_df, use_container_width=True, hide_index=True)
 
+# ==============================
+# 6. Price per ZIP Code Map
+# ==============================
+st.markdown("---")
+st.markdown("### 🗺️ Predicted Apartment Price per ZIP Code")
 
+price_map, _ = load_report_table(APARTMENT_PRICE_MAP_FILE)
+if price_map is None:
+    st.warning("⚠️ Price map not built for this model version. Run `python -m prediction.price_map` from the `streamlit` directory.")
+else:
+    reference = REFERENCE_APARTMENT
+    st.write(
+        f"Predicted price of the same reference apartment in each ZIP code: {reference['total_area_sqm']} sqm, "
+        f"{reference['nbr_bedrooms']} bedrooms, built in {reference['construction_year']}, "
+        f"state {reference['state_building'].lower()}, {reference['heating_type'].lower()} heating."
+    )
+    # Color from green (cheapest ZIP codes) to red (most expensive)
+    rank = price_map["price_per_sqm"].rank(pct=True)
+    map_df = price_map.assign(
+        color=[[int(255 * r), int(255 * (1 - r)), 80, 180] for r in rank],
+        price_label=price_map["price"].map("€{:,.0f}".format),
+        price_per_sqm_label=price_map["price_per_sqm"].map("€{:,.0f}".format),
+    )
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=map_df,
+        get_position=["longitude", "latitude"],
+        get_fill_color="color",
+        get_radius=1500,
+        pickable=True,
+    )
+    st.pydeck_chart(pdk.Deck(
+        layers=[layer],
+        initial_view_state=pdk.ViewState(latitude=50.6, longitude=4.6, zoom=7),
+        tooltip={"text": "{zip_code} {city} ({province})\n{price_label}, {price_per_sqm_label}/sqm"},
+    ))
 
 # ==============================
 # 7. Model Metrics
 # ==============================
 st.markdown("---")
 st.markdown("### 📊 Model Performance Metrics")
-st.markdown(
+st.write("Cross-validated on the training data, in euros, as computed by `python -m prediction.evaluation`.")
+
+
+def metrics_table(groups):
     """
-    #### **Apartment Model:**
-    - **R² Score**: 0.7078
-    - **Mean Absolute Error (MAE)**: €38,692.80
-    - **Median Absolute Error**: €25,947.45
-
-    #### **House Model:**
-    - **R² Score**: 0.7352
-    - **Mean Absolute Error (MAE)**: €45,213.67
-    - **Median Absolute Error**: €31,548.32
+    One row per group of an evaluation report breakdown.
     """
-)
+    table = pd.DataFrame.from_dict(groups, orient="index")
+    return pd.DataFrame({
+        "Listings": table["rows"],
+        "R²": table["r2"].round(4),
+        "MAE (€)": table["mae"].round(0),
+        "Median AE (€)": table["median_ae"].round(0),
+        "MAPE (%)": table["mape"].round(2),
+    })
+
+
+for title, model_file in [("Apartment Model", APARTMENT_MODEL_FILE), ("House Model", HOUSE_MODEL_FILE)]:
+    st.markdown(f"#### **{title}:**")
+    report = load_metrics(model_file)
+    if report is None:
+        st.write("Metrics have not been computed for this model version yet.")
+        continue
+    overall = report["overall"]
+    st.markdown(
+        f"""
+        - **R² Score**: {overall['r2']:.4f}
+        - **Mean Absolute Error (MAE)**: €{overall['mae']:,.2f}
+        - **Median Absolute Error**: €{overall['median_ae']:,.2f}
+        """
+    )
+    st.caption(f"{report['folds']}-fold cross-validation on {overall['rows']:,} listings, model `{report['model_version']}`.")
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        st.markdown("By province")
+        st.dataframe(metrics_table(report["by_province"]).sort_values("Listings", ascending=False), use_container_width=True)
+    with col2:
+        # R² within a narrow band of actual prices says little, so it is left out
+        st.markdown("By actual price band")
+        st.dataframe(metrics_table(report["by_price_band"]).drop(columns="R²"), use_container_width=True)
 
 # ==============================
-# 5. Visualization: Scatter Plot
+# 8. Visualization: Scatter Plot
 # ==============================
 st.markdown("---")
 st.markdown("### 🌍 Geographical Distribution of Properties used within the model")
@@ -115,7 +217,7 @@ else:
 
 
 # ==============================
-# 8. Footer
+# 9. Footer
 # ==============================
 st.markdown("---")
 st.markdown(
@@ -0,0 +1,120 @@
+"""
+Measure request/response serialization cost of JSON against the Arrow IPC and
+Parquet bulk formats, without model inference. Run from the repository root:
+
+    python streamlit/benchmarks/bulk_format.py --rows 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from fastapi.responses import JSONResponse
+
+STREAMLIT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(STREAMLIT_DIR)
+sys.path.append(os.path.join(os.path.dirname(STREAMLIT_DIR), "api"))
+
+from app import PredictionRequest
+from prediction.bulk import ARROW_STREAM, PARQUET, predictions_table, read_table, table_to_frame, write_table
+from prediction.data import APARTMENT_INPUT_FIELDS, load_apartments
+
+
+def sample_frame(rows, seed=535):
+    df = load_apartments()[APARTMENT_INPUT_FIELDS]
+    df = df.iloc[np.random.default_rng(seed).integers(0, len(df), rows)].reset_index(drop=True)
+    df.insert(0, "id", np.arange(rows))
+    return df
+
+
+def fake_scores(rows):
+    prices = np.random.default_rng(0).uniform(100_000, 600_000, rows)
+    prices[::50] = np.nan
+    messages = pd.Series("zip_code is not a known 4-digit Belgian ZIP code", index=np.flatnonzero(np.isnan(prices)))
+    return prices, messages
+
+# ==============================
+# 1. JSON (the /predict/<model> routes)
+# ==============================
+def json_round_trip(df, prices, messages):
+    timings = {}
+    start = time.perf_counter()
+    records = df.drop(columns="id").astype(object).where(df.notna(), None).to_dict(orient="records")
+    body = json.dumps({"data": records}).encode()
+    timings["client encode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = pd.DataFrame(PredictionRequest.model_validate_json(body).data)
+    timings["server decode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = JSONResponse({
+        "predictions": [None if np.isnan(price) else round(float(price), 2) for price in prices],
+        "errors": [{"row": int(row), "message": message} for row, message in messages.items()],
+    }).body
+    timings["server encode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    np.array(json.loads(response)["predictions"], dtype=float)
+    timings["client decode"] = time.perf_counter() - start
+    assert len(features) == len(df)
+    return timings, len(body), len(response)
+
+# ==============================
+# 2. Arrow IPC / Parquet (the /predict/<model>/bulk routes)
+# ==============================
+def bulk_round_trip(df, prices, messages, fmt):
+    timings = {}
+    start = time.perf_counter()
+    body = write_table(pa.Table.from_pandas(df, preserve_index=False), fmt)
+    timings["client encode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids, features = table_to_frame(read_table(body, fmt))
+    timings["server decode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = write_table(predictions_table(ids, prices, messages), fmt)
+    timings["server encode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    read_table(response, fmt).column("price").to_numpy()
+    timings["client decode"] = time.perf_counter() - start
+    assert len(features) == len(df)
+    return timings, len(body), len(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    df = sample_frame(args.rows)
+    prices, messages = fake_scores(args.rows)
+    formats = {
+        "json": lambda: json_round_trip(df, prices, messages),
+        "arrow": lambda: bulk_round_trip(df, prices, messages, ARROW_STREAM),
+        "parquet": lambda: bulk_round_trip(df, prices, messages, PARQUET),
+    }
+
+    print(f"{args.rows:,} rows, best of {args.repeats}; times in ms")
+    columns = ["client encode", "server decode", "server encode", "client decode"]
+    print(f"{'format':<9}" + "".join(f"{c:>15}" for c in columns) + f"{'server total':>15}{'request KB':>12}{'response KB':>12}")
+    for name, round_trip in formats.items():
+        runs = [round_trip() for _ in range(args.repeats)]
+        best = {c: min(run[0][c] for run in runs) * 1000 for c in columns}
+        _, request_bytes, response_bytes = runs[0]
+        server = best["server decode"] + best["server encode"]
+        print(
+            f"{name:<9}" + "".join(f"{best[c]:>15.1f}" for c in columns)
+            + f"{server:>15.1f}{request_bytes / 1024:>12,.0f}{response_bytes / 1024:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
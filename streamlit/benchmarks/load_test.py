@@ -0,0 +1,202 @@
+"""
+Load-test the prediction API at stepped concurrency levels.
+
+Replays apartment payloads sampled from apartments_sqm.csv against a locally
+started API (or an already running one with --url) and reports throughput,
+p50/p99 latency and error rate per level. Run from the repository root:
+
+    python streamlit/benchmarks/load_test.py --levels 1 4 16 64 --output load_test.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction.data import APARTMENT_INPUT_FIELDS, load_apartments
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# ==============================
+# 1. Payloads
+# ==============================
+def build_payloads(count, rows_per_request, seed=535):
+    """
+    Sample `count` request bodies of `rows_per_request` listings each.
+    """
+    df = load_apartments()[APARTMENT_INPUT_FIELDS]
+    # NaN is not valid JSON, missing optional values are sent as null
+    df = df.astype(object).where(df.notna(), None)
+    records = df.to_dict(orient="records")
+    rows = np.random.default_rng(seed).integers(0, len(records), (count, rows_per_request))
+    return [json.dumps({"data": [records[i] for i in batch]}) for batch in rows]
+
+# ==============================
+# 2. Local Service
+# ==============================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(url, process=None, timeout=120):
+    """
+    Poll /ready until the API has warmed up its models. Raises when the
+    warm-up failed (a 503 carrying an error), the local process exited or
+    `timeout` seconds went by.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = httpx.get(url + "/ready")
+            if response.status_code == 200:
+                return
+            error = response.json().get("error")
+            if error:
+                raise RuntimeError(f"Prediction service failed to warm up: {error}")
+        except httpx.TransportError:
+            pass
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("Prediction service exited before it was ready")
+        time.sleep(0.2)
+    raise RuntimeError(f"Prediction service was not ready after {timeout} s")
+
+
+def start_service(workers):
+    """
+    Start the API with uvicorn in a subprocess and wait until it is ready.
+    """
+    port = free_port()
+    # Measure capacity, not the per-client rate limit: one load generator
+    # stands in for many clients. Load shedding stays active.
+    env = dict(os.environ, ADMISSION_RATE_PER_CLIENT="1e9", ADMISSION_BURST_PER_CLIENT="1000000000")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app:app",
+            "--app-dir", os.path.join(REPO_ROOT, "api"),
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(url, process)
+    except RuntimeError:
+        process.terminate()
+        raise
+    return process, url
+
+# ==============================
+# 3. Load Generation
+# ==============================
+async def run_level(client, endpoint, payloads, concurrency, duration):
+    """
+    Keep `concurrency` requests in flight for `duration` seconds.
+    """
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        i = offset
+        headers = {"Content-Type": "application/json", "X-Client-Id": f"load-test-{offset}"}
+        while time.perf_counter() < stop_at:
+            body = payloads[i % len(payloads)]
+            i += concurrency
+            start = time.perf_counter()
+            try:
+                response = await client.post(endpoint, content=body, headers=headers)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)) if len(latencies) else None,
+        "p99_ms": float(np.percentile(latencies_ms, 99)) if len(latencies) else None,
+        "error_rate": errors / len(latencies) if len(latencies) else None,
+    }
+
+
+async def run(url, endpoint, payloads, levels, duration, warmup):
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        await run_level(client, endpoint, payloads, min(levels), warmup)
+        return [await run_level(client, endpoint, payloads, level, duration) for level in levels]
+
+
+def print_table(results, rows_per_request):
+    print(f"{'concurrency':>12}{'requests':>10}{'req/s':>10}{'pred/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for r in results:
+        print(
+            f"{r['concurrency']:>12}{r['requests']:>10}{r['throughput_rps']:>10.1f}"
+            f"{r['throughput_rps'] * rows_per_request:>10.1f}{r['p50_ms'] or 0:>10.2f}"
+            f"{r['p99_ms'] or 0:>10.2f}{(r['error_rate'] or 0):>9.2%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Target an already running API instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local API")
+    parser.add_argument("--endpoint", default="/predict/apartment")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of warm-up traffic")
+    parser.add_argument("--rows-per-request", type=int, default=1)
+    parser.add_argument("--payloads", type=int, default=5000)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.payloads, args.rows_per_request)
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_service(args.workers)
+    else:
+        wait_until_ready(url)
+    try:
+        results = asyncio.run(run(url, args.endpoint, payloads, args.levels, args.duration, args.warmup))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print_table(results, args.rows_per_request)
+    if args.output:
+        report = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "url": url,
+            "endpoint": args.endpoint,
+            "workers": args.workers if args.url is None else None,
+            "rows_per_request": args.rows_per_request,
+            "duration_s": args.duration,
+            "levels": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark the onnxruntime backend against the joblib pipeline.
+
+Export the ONNX model first (python -m prediction.onnx_backend from the
+streamlit directory), then run from the repository root:
+
+    python streamlit/benchmarks/onnx_backend.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction.artifacts import APARTMENT_MODEL_FILE
+from prediction.data import APARTMENT_FEATURES, load_apartments
+from prediction.models import load_pipeline, predict
+
+
+def sample_batch(df, size, seed=535):
+    rows = np.random.default_rng(seed).integers(0, len(df), size)
+    return df.iloc[rows].reset_index(drop=True)
+
+
+def time_calls(predict_fn, batch, min_seconds):
+    """
+    Median seconds per call, repeating for at least `min_seconds`.
+    """
+    durations = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < min_seconds or len(durations) < 3:
+        start = time.perf_counter()
+        predict_fn(batch)
+        durations.append(time.perf_counter() - start)
+    return float(np.median(durations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--min-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    df = load_apartments()[APARTMENT_FEATURES]
+    backends = {name: load_pipeline(APARTMENT_MODEL_FILE, backend=name) for name in ["joblib", "onnx"]}
+
+    print(f"{'rows':>8}{'joblib ms':>14}{'onnx ms':>14}{'speed-up':>10}")
+    for size in args.batch_sizes:
+        batch = sample_batch(df, size)
+        timings = {
+            name: time_calls(lambda X, p=pipeline: predict(p, X), batch, args.min_seconds) * 1000
+            for name, pipeline in backends.items()
+        }
+        print(f"{size:>8}{timings['joblib']:>14.3f}{timings['onnx']:>14.3f}{timings['joblib'] / timings['onnx']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
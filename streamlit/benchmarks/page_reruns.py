@@ -0,0 +1,96 @@
+"""
+Measure the server-side time of the prediction pages per interaction, using
+Streamlit's AppTest harness in-process. Pass page files (for example an older
+revision saved with `git show <rev>:<path> > old_page.py`) to compare them.
+Run from the repository root:
+
+    python streamlit/benchmarks/page_reruns.py streamlit/Pages/appartment_prediction.py
+
+AppTest replays every interaction as a rerun of the whole script; in the
+browser, a submit inside an `st.fragment` reruns only the fragment. The pages
+count their script and panel runs and time the panel in
+`st.session_state` (`reruns_apartment`, `reruns_house`), so the report shows both: the full rerun
+measured by AppTest and the part of it a fragment-scoped rerun would repeat.
+Pages without those counters only get the full rerun.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+STREAMLIT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Pages saved outside the tree still need the shared `prediction` package
+sys.path.append(STREAMLIT_DIR)
+
+
+# Session keys of the page counters; "reruns" is the key older revisions
+# shared between the pages
+RERUNS_KEYS = ["reruns_apartment", "reruns_house", "reruns"]
+
+
+def rerun_counters(at):
+    key = next((key for key in RERUNS_KEYS if key in at.session_state), None)
+    return dict(at.session_state[key]) if key is not None else None
+
+
+def timed_run(at, run):
+    """
+    Run one interaction. Returns the AppTest wall time and the time spent in
+    the prediction panel in ms (None for pages without counters), and the
+    number of script and panel runs it caused.
+    """
+    before = rerun_counters(at)
+    start = time.perf_counter()
+    run()
+    wall = (time.perf_counter() - start) * 1000
+    after = rerun_counters(at)
+    if after is None:
+        return wall, None, None, None
+    before = before or {"page": 0, "panel": 0, "panel_seconds": 0.0}
+    panel = (after["panel_seconds"] - before["panel_seconds"]) * 1000
+    return wall, panel, after["page"] - before["page"], after["panel"] - before["panel"]
+
+
+def benchmark_page(path, interactions):
+    at = AppTest.from_file(os.path.abspath(path), default_timeout=120)
+    results = {"page load": [timed_run(at, at.run)]}
+    if at.exception or not at.button:
+        print(f"{path}: the page stopped before rendering its form ({[e.value for e in at.error]})")
+        return None
+
+    # Distinct inputs first (cache misses), then the same inputs again
+    area = at.number_input[0]
+    values = [area.min + i for i in range(interactions)]
+    for label in ["submit, new inputs", "submit, repeated inputs"]:
+        results[label] = []
+        for value in values:
+            at.number_input[0].set_value(value)
+            results[label].append(timed_run(at, at.button[0].click().run))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="+")
+    parser.add_argument("--interactions", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"median of {args.interactions} interactions; times in ms, runs per interaction")
+    print(f"{'page':<40}{'interaction':<26}{'full rerun':>12}{'fragment':>10}{'runs':>16}")
+    for path in args.pages:
+        results = benchmark_page(path, args.interactions)
+        for label, runs in (results or {}).items():
+            wall = statistics.median(run[0] for run in runs)
+            if runs[0][1] is None:
+                fragment, counts = "-", "-"
+            else:
+                fragment = f"{statistics.median(run[1] for run in runs):.1f}"
+                counts = f"{runs[-1][2]} page/{runs[-1][3]} panel"
+            print(f"{os.path.basename(path):<40}{label:<26}{wall:>12.1f}{fragment:>10}{counts:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark the adaptive XGBoost threading policy against XGBoost's defaults.
+
+Run from the repository root:
+
+    python streamlit/benchmarks/threading_policy.py
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction.artifacts import APARTMENT_MODEL_FILE
+from prediction.data import APARTMENT_FEATURES, load_apartments
+from prediction.models import load_pipeline
+from prediction.threading_policy import ThreadingPolicy
+
+
+def sample_batch(df, size, seed=535):
+    rows = np.random.default_rng(seed).integers(0, len(df), size)
+    return df.iloc[rows].reset_index(drop=True)
+
+
+def single_row_latency(predict_fn, rows, concurrency):
+    """
+    Median and p99 latency (ms) of one-row calls issued by `concurrency` threads.
+    """
+    def timed(i):
+        start = time.perf_counter()
+        predict_fn(rows.iloc[[i]])
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(timed, range(len(rows))))) * 1000
+    return np.median(latencies), np.percentile(latencies, 99)
+
+
+def batch_throughput(predict_fn, batch, repeats):
+    """
+    Best-of-`repeats` throughput in rows per second.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_fn(batch)
+        best = min(best, time.perf_counter() - start)
+    return len(batch) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--single-rows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(APARTMENT_MODEL_FILE)
+    df = load_apartments()[APARTMENT_FEATURES]
+    policy = ThreadingPolicy()
+    candidates = {"default": pipeline.predict, "policy": lambda X: policy.predict(pipeline, X)}
+
+    # Warm both paths so first-call costs do not skew the numbers
+    for predict_fn in candidates.values():
+        predict_fn(df.head(1000))
+
+    print(f"CPUs available: {policy.max_threads}")
+    print(f"\n{'single row':<24}{'p50 ms':>10}{'p99 ms':>10}")
+    rows = sample_batch(df, args.single_rows)
+    for concurrency in args.concurrency:
+        for name, predict_fn in candidates.items():
+            p50, p99 = single_row_latency(predict_fn, rows, concurrency)
+            print(f"{name} x{concurrency:<15}{p50:>10.3f}{p99:>10.3f}")
+
+    print(f"\n{'batch':<24}{'rows/s':>20}")
+    for size in args.batch_sizes:
+        batch = sample_batch(df, size)
+        for name, predict_fn in candidates.items():
+            rate = batch_throughput(predict_fn, batch, args.repeats)
+            print(f"{name} {size:<17}{rate:>20,.0f}")
+
+
+if __name__ == "__main__":
+    main()
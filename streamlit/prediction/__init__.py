@@ -0,0 +1,3 @@
+"""
+Shared prediction code used by the Streamlit pages and batch tools.
+"""
@@ -0,0 +1,176 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+
+class Rejected(Exception):
+    """
+    A request turned away before reaching the model.
+
+    `status_code` is 429 for clients over their rate limit and 503 when the
+    service sheds load; `retry_after` is a hint in seconds.
+    """
+
+    def __init__(self, status_code, reason, retry_after=1):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `burst`.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now=None):
+        now = time.monotonic() if now is None else now
+        # `now` may predate a bucket created during the same admission
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = max(now, self.updated)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def seconds_until_token(self):
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class AdmissionController:
+    """
+    Admission control in front of one model.
+
+    At most `max_in_flight` calls run at once and at most `max_queue` wait
+    for a slot. Each client gets a token bucket of `rate` requests per
+    second (bursts up to `burst`). A request is shed as soon as its expected
+    queueing plus service time no longer fits its latency budget, instead of
+    waiting until it times out. Service time is tracked as an exponentially
+    weighted moving average of the admitted calls.
+
+    Meant for a single asyncio event loop, so the counters need no lock.
+    """
+
+    def __init__(
+        self,
+        max_in_flight=4,
+        max_queue=64,
+        rate=20.0,
+        burst=40,
+        latency_budget=1.0,
+        max_clients=10_000,
+        initial_service_time=0.05,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.rate = rate
+        self.burst = burst
+        self.latency_budget = latency_budget
+        self.max_clients = max_clients
+        self.service_time = initial_service_time
+        self.in_flight = 0
+        self.queued = 0
+        self.counters = {"admitted": 0, "rate_limited": 0, "shed_queue_full": 0, "shed_deadline": 0}
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._buckets = OrderedDict()
+
+    def _bucket(self, client):
+        bucket = self._buckets.pop(client, None) or TokenBucket(self.rate, self.burst)
+        self._buckets[client] = bucket
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def expected_wait(self):
+        """
+        Estimated seconds a new request waits for a free slot.
+        """
+        if self.in_flight < self.max_in_flight:
+            return 0.0
+        return math.ceil((self.queued + 1) / self.max_in_flight) * self.service_time
+
+    def _shed(self, reason):
+        self.counters[f"shed_{reason}"] += 1
+        raise Rejected(503, f"Service overloaded ({reason.replace('_', ' ')})", math.ceil(self.expected_wait()) or 1)
+
+    @asynccontextmanager
+    async def admit(self, client, budget=None):
+        """
+        Wait for a slot for `client`, or raise Rejected straight away when the
+        request cannot be served within `budget` seconds.
+        """
+        now = time.monotonic()
+        deadline = now + (budget or self.latency_budget)
+
+        bucket = self._bucket(client)
+        if not bucket.take(now):
+            self.counters["rate_limited"] += 1
+            raise Rejected(429, "Rate limit exceeded", math.ceil(bucket.seconds_until_token()) or 1)
+        if self.in_flight >= self.max_in_flight and self.queued >= self.max_queue:
+            self._shed("queue_full")
+        if now + self.expected_wait() + self.service_time > deadline:
+            self._shed("deadline")
+
+        self.queued += 1
+        try:
+            if self._slots.locked():
+                await asyncio.wait_for(self._slots.acquire(), timeout=max(0.0, deadline - now - self.service_time))
+            else:
+                # A free slot is taken at once, even with no slack left in the budget
+                await self._slots.acquire()
+        except asyncio.TimeoutError:
+            self._shed("deadline")
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        self.counters["admitted"] += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.service_time += 0.2 * (time.monotonic() - started - self.service_time)
+            self.in_flight -= 1
+            self._slots.release()
+
+    def metrics(self):
+        return {
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "service_time_seconds": self.service_time,
+            **self.counters,
+        }
+
+
+def prometheus_metrics(controllers):
+    """
+    Render the metrics of named controllers in the Prometheus text format.
+    """
+    gauges = {
+        "queue_depth": "Requests waiting for a model slot",
+        "in_flight": "Requests currently being scored",
+        "service_time_seconds": "Moving average of the model call duration",
+    }
+    counters = {
+        "admitted": "Requests admitted to the model",
+        "rate_limited": "Requests rejected by the per-client rate limit",
+        "shed_queue_full": "Requests shed because the queue was full",
+        "shed_deadline": "Requests shed because they could not meet their latency budget",
+    }
+    lines = []
+    for kind, descriptions in [("gauge", gauges), ("counter", counters)]:
+        for key, description in descriptions.items():
+            name = f"prediction_{key}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for model, controller in controllers.items():
+                lines.append(f'{name}{{model="{model}"}} {controller.metrics()[key]}')
+    return "\n".join(lines) + "\n"
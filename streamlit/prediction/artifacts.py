@@ -0,0 +1,25 @@
+import os
+
+# ==============================
+# Artifact Locations
+# ==============================
+STREAMLIT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINED_MODELS_DIR = os.path.join(STREAMLIT_DIR, "Pages", "Trained_Models")
+DATA_DIR = os.path.join(os.path.dirname(STREAMLIT_DIR), "Data Folder")
+
+APARTMENT_MODEL_FILE = "apartments_xgb_model_log.joblib"
+HOUSE_MODEL_FILE = "price_prediction_pipeline.joblib"
+
+
+def artifact_path(file_name):
+    """
+    Get the absolute path of a file stored in the Trained_Models directory.
+    """
+    return os.path.join(TRAINED_MODELS_DIR, file_name)
+
+
+def data_path(file_name):
+    """
+    Get the absolute path of a file stored in the Data Folder directory.
+    """
+    return os.path.join(DATA_DIR, file_name)
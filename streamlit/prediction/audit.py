@@ -0,0 +1,332 @@
+"""
+Batched prediction audit log in Parquet.
+
+Scoring threads only append the scored batch (features, prices, model
+version) to an in-memory queue. A background thread converts the queued
+batches to Arrow and appends them as row groups to one Parquet file per
+model, which is rotated by size, age and day:
+
+    <directory>/<model>/<YYYY-MM-DD>/<HHMMSS>-<pid>-<log id>-<sequence>.parquet
+
+The process id and a random id per log keep the names of the workers (and
+containers) sharing a directory apart. Files being written carry an
+`.inprogress` suffix until they are closed, so readers only ever see complete
+files. The queue is bounded: when the writer falls behind, new batches are
+dropped instead of slowing down predictions; they are counted in the metrics
+and reported in a warning at most once a minute. Batches that cannot be
+written are logged and counted as failed, without stopping the writer.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from prediction.artifacts import STREAMLIT_DIR
+
+DEFAULT_AUDIT_DIR = os.path.join(os.path.dirname(STREAMLIT_DIR), "audit_logs")
+IN_PROGRESS_SUFFIX = ".inprogress"
+
+logger = logging.getLogger(__name__)
+
+# Columns every record has, ahead of the model's feature columns
+RECORD_COLUMNS = ["timestamp", "request_id", "row", "model", "model_version", "price"]
+
+# ==============================
+# 1. Writer Thread
+# ==============================
+class AuditLog:
+    """
+    Asynchronous audit log sink.
+
+    `max_buffered_rows` bounds the rows waiting in memory, `flush_interval`
+    is how often (in seconds) queued batches are written out, and a file is
+    closed once it holds `rotate_rows` rows, is `rotate_seconds` old or the
+    day changes. Dropped rows are logged at most every `drop_warning_interval`
+    seconds.
+    """
+
+    def __init__(
+        self,
+        directory=DEFAULT_AUDIT_DIR,
+        max_buffered_rows=100_000,
+        flush_interval=1.0,
+        rotate_rows=500_000,
+        rotate_seconds=3600,
+        drop_warning_interval=60.0,
+    ):
+        self.directory = directory
+        self.max_buffered_rows = max_buffered_rows
+        self.flush_interval = flush_interval
+        self.rotate_rows = rotate_rows
+        self.rotate_seconds = rotate_seconds
+        self.drop_warning_interval = drop_warning_interval
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._buffered_rows = 0
+        self._files = {}
+        self._sequence = 0
+        self._file_prefix = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._unreported_drops = 0
+        self._last_drop_warning = None
+        self._thread = None
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.failed_rows = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """
+        Write out everything still queued, close the open files and stop the
+        writer thread.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def writer(self, model, model_version):
+        """
+        A scoring observer that logs the batches of one model.
+        """
+        return AuditWriter(self, model, model_version)
+
+    def record(self, model, model_version, features, prices):
+        """
+        Queue a scored batch. Returns False when it was dropped because the
+        buffer is full.
+        """
+        rows = len(prices)
+        with self._lock:
+            if self._buffered_rows + rows > self.max_buffered_rows:
+                self.dropped_rows += rows
+                self._report_drops(rows)
+                return False
+            self._buffered_rows += rows
+        self._queue.put((time.time(), uuid.uuid4().hex, model, model_version, features, np.asarray(prices)))
+        return True
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "buffered_rows": self._buffered_rows,
+                "written_rows": self.written_rows,
+                "dropped_rows": self.dropped_rows,
+                "failed_rows": self.failed_rows,
+            }
+
+    def _report_drops(self, rows):
+        # Called with the lock held
+        self._unreported_drops += rows
+        now = time.monotonic()
+        if self._last_drop_warning is not None and now - self._last_drop_warning < self.drop_warning_interval:
+            return
+        logger.warning(
+            "Audit log buffer full (%d rows): dropped %d rows since the last warning, %d in total",
+            self.max_buffered_rows, self._unreported_drops, self.dropped_rows,
+        )
+        self._unreported_drops = 0
+        self._last_drop_warning = now
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                batches = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batches = []
+            while True:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batches:
+                stopping = True
+                batches = [batch for batch in batches if batch is not None]
+            # Keep the thread alive whatever goes wrong, or records would
+            # pile up in the queue until they are dropped
+            try:
+                self._write(batches)
+            except Exception:
+                logger.exception("Audit log writer failed")
+            self._rotate(force=stopping)
+
+    def _write(self, batches):
+        by_model = {}
+        for batch in batches:
+            by_model.setdefault(batch[2], []).append(batch)
+        for model, model_batches in by_model.items():
+            tables = []
+            for batch in model_batches:
+                try:
+                    tables.append(_record_table(*batch))
+                except Exception:
+                    logger.exception("Could not convert %d audit rows of %s", len(batch[5]), model)
+                    self._count(len(batch[5]), written=False)
+            if not tables:
+                continue
+            # One row group per model and flush; when that write fails, retry
+            # batch by batch so only the faulty ones are lost
+            try:
+                table = pa.concat_tables(tables, promote_options="permissive")
+                self._write_table(model, table)
+            except Exception:
+                for table in tables:
+                    try:
+                        self._write_table(model, table)
+                    except Exception:
+                        logger.exception("Could not write %d audit rows of %s", table.num_rows, model)
+                        self._count(table.num_rows, written=False)
+
+    def _write_table(self, model, table):
+        self._file_for(model, table.schema).write_table(table)
+        self._files[model]["rows"] += table.num_rows
+        self._count(table.num_rows, written=True)
+
+    def _count(self, rows, written):
+        with self._lock:
+            self._buffered_rows -= rows
+            if written:
+                self.written_rows += rows
+            else:
+                self.failed_rows += rows
+
+    def _file_for(self, model, schema):
+        current = self._files.get(model)
+        if current is not None and not current["writer"].schema.equals(schema):
+            self._close(model)
+            current = None
+        if current is None:
+            now = datetime.now(timezone.utc)
+            self._sequence += 1
+            day_dir = os.path.join(self.directory, model, now.strftime("%Y-%m-%d"))
+            os.makedirs(day_dir, exist_ok=True)
+            path = os.path.join(day_dir, f"{now.strftime('%H%M%S')}-{self._file_prefix}-{self._sequence:06d}.parquet")
+            current = {
+                "path": path,
+                "writer": pq.ParquetWriter(path + IN_PROGRESS_SUFFIX, schema),
+                "opened": time.time(),
+                "day": now.date(),
+                "rows": 0,
+            }
+            self._files[model] = current
+        return current["writer"]
+
+    def _rotate(self, force=False):
+        today = datetime.now(timezone.utc).date()
+        for model, current in list(self._files.items()):
+            if (
+                force
+                or current["rows"] >= self.rotate_rows
+                or time.time() - current["opened"] >= self.rotate_seconds
+                or current["day"] != today
+            ):
+                try:
+                    self._close(model)
+                except Exception:
+                    logger.exception("Could not close the audit file %s", current["path"])
+
+    def _close(self, model):
+        current = self._files.pop(model)
+        current["writer"].close()
+        os.replace(current["path"] + IN_PROGRESS_SUFFIX, current["path"])
+
+
+class AuditWriter:
+    """
+    Observer passed to `score_batch`; forwards scored batches to the log.
+    """
+
+    def __init__(self, log, model, model_version):
+        self.log = log
+        self.model = model
+        self.model_version = model_version
+
+    def update(self, features, predicted_prices):
+        self.log.record(self.model, self.model_version, features, predicted_prices)
+
+
+def _record_table(timestamp, request_id, model, model_version, features, prices):
+    rows = len(prices)
+    columns = {
+        "timestamp": pa.array(np.full(rows, int(timestamp * 1_000_000)), pa.timestamp("us", tz="UTC")),
+        "request_id": pa.array(np.full(rows, request_id), pa.string()),
+        "row": pa.array(np.arange(rows), pa.int32()),
+        "model": pa.array(np.full(rows, model), pa.string()),
+        "model_version": pa.array(np.full(rows, model_version, dtype=object), pa.string()),
+        "price": pa.array(prices, pa.float64()),
+    }
+    # Numeric features are stored as float64 and everything else as strings,
+    # so every batch of a model has the same schema
+    for column in features.columns:
+        values = features[column]
+        if pd.api.types.is_numeric_dtype(values) or values.isna().all():
+            columns[column] = pa.array(values.to_numpy(dtype=float), pa.float64())
+        else:
+            columns[column] = pa.array(values.astype(object).where(values.notna(), None).to_numpy(), pa.string())
+    return pa.table(columns)
+
+
+@lru_cache(maxsize=None)
+def open_audit_log():
+    """
+    The process-wide audit log, configured through AUDIT_LOG_DIR,
+    AUDIT_LOG_MAX_BUFFERED_ROWS and AUDIT_LOG_FLUSH_INTERVAL_S. Its writer
+    thread starts on first use and the log is flushed when the process exits.
+    """
+    log = AuditLog(
+        directory=os.environ.get("AUDIT_LOG_DIR", DEFAULT_AUDIT_DIR),
+        max_buffered_rows=int(os.environ.get("AUDIT_LOG_MAX_BUFFERED_ROWS", 100_000)),
+        flush_interval=float(os.environ.get("AUDIT_LOG_FLUSH_INTERVAL_S", 1.0)),
+    )
+    atexit.register(log.close)
+    return log.start()
+
+
+def prometheus_audit(log):
+    """
+    Render the audit log counters in the Prometheus text format.
+    """
+    descriptions = {
+        "buffered_rows": ("gauge", "Scored rows waiting to be written to the audit log"),
+        "written_rows": ("counter", "Scored rows written to the audit log"),
+        "dropped_rows": ("counter", "Scored rows dropped because the audit buffer was full"),
+        "failed_rows": ("counter", "Scored rows that could not be written to the audit log"),
+    }
+    lines = []
+    for key, value in log.metrics().items():
+        kind, description = descriptions[key]
+        name = f"prediction_audit_{key}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+# ==============================
+# 2. Reader
+# ==============================
+def read_audit_log(day, model, columns=None, directory=DEFAULT_AUDIT_DIR):
+    """
+    Load the closed audit files of one model for one day (a date or a
+    "YYYY-MM-DD" string), reading only `columns` when given.
+    """
+    day = day if isinstance(day, str) else day.strftime("%Y-%m-%d")
+    day_dir = os.path.join(directory, model, day)
+    files = sorted(f for f in os.listdir(day_dir) if f.endswith(".parquet")) if os.path.isdir(day_dir) else []
+    tables = [pq.read_table(os.path.join(day_dir, f), columns=columns) for f in files]
+    if not tables:
+        return pd.DataFrame(columns=columns or RECORD_COLUMNS)
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas()
@@ -0,0 +1,72 @@
+"""
+Arrow IPC / Parquet bulk format for batch scoring.
+
+Clients upload one table with the apartment or house input columns plus an
+optional `id` column. The columns are converted to a DataFrame in one go,
+without building an object per row, and the predictions come back as a table
+with `id`, `price` (null for rejected rows) and `error` columns.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+BULK_FORMATS = [ARROW_STREAM, PARQUET]
+
+
+def bulk_format(content_type):
+    """
+    The bulk format named by a Content-Type or Accept header, or None.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("application/x-parquet", "application/parquet"):
+        return PARQUET
+    return media_type if media_type in BULK_FORMATS else None
+
+
+def read_table(body, fmt):
+    if fmt == PARQUET:
+        return pq.read_table(pa.BufferReader(body))
+    with pa.ipc.open_stream(pa.BufferReader(body)) as reader:
+        return reader.read_all()
+
+
+def write_table(table, fmt):
+    sink = pa.BufferOutputStream()
+    if fmt == PARQUET:
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def table_to_frame(table):
+    """
+    Split an uploaded table into the row ids and a feature DataFrame.
+
+    Rows without an `id` column are numbered from 0.
+    """
+    if "id" in table.column_names:
+        ids = table.column("id")
+        table = table.drop_columns(["id"])
+    else:
+        ids = pa.array(np.arange(table.num_rows))
+    return ids, table.to_pandas()
+
+
+def predictions_table(ids, prices, messages):
+    """
+    Build the response table from `score_batch` output.
+
+    `messages` is indexed by row position, as returned for a DataFrame with
+    a default index.
+    """
+    errors = np.full(len(prices), None, dtype=object)
+    errors[messages.index.to_numpy(dtype=np.int64)] = messages.to_numpy()
+    return pa.table({
+        "id": ids,
+        "price": pa.array(prices, mask=np.isnan(prices)),
+        "error": pa.array(errors, type=pa.string()),
+    })
@@ -0,0 +1,312 @@
+"""
+Persistent prediction cache shared by the processes of one node.
+
+Raw model outputs are stored in a local SQLite file, keyed by the model
+version and a 128-bit hash of the normalized feature row, so a restarted or
+sibling worker (uvicorn or Streamlit) serves repeated valuations from disk
+instead of recomputing them. The database runs in WAL mode: any number of
+processes read it concurrently while one of them writes. When the live data
+grows past `max_bytes`, the least recently used entries are deleted.
+
+The cache is off unless PREDICTION_CACHE_PATH points to the database file
+(created on first use); PREDICTION_CACHE_MAX_MB caps its size.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from prediction.models import predict
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Keys are two independent 64-bit hashes of the row (pandas' default key
+# and this one)
+SECOND_HASH_KEY = "immo-eliza-cache"
+HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+# SQLite's limit on bound parameters is far higher, but long IN lists
+# stop paying off well before it
+CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    model_version TEXT NOT NULL,
+    key BLOB NOT NULL,
+    value REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model_version, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used);
+"""
+
+# ==============================
+# 1. Keys
+# ==============================
+def feature_keys(features):
+    """
+    One 16-byte key per row of `features`, independent of the column order
+    and of whether numbers arrive as int or float.
+    """
+    columns = sorted(features.columns)
+    # Row hashes would not cover the column names, so start from them
+    names = pd.util.hash_array(np.array(["\x1f".join(map(str, columns))], dtype=object), categorize=False)
+    first = np.full(len(features), names[0])
+    second = np.full(len(features), names[0])
+    with np.errstate(over="ignore"):
+        for column in columns:
+            values = features[column]
+            if pd.api.types.is_numeric_dtype(values):
+                values = values.to_numpy(dtype=float)
+            else:
+                values = values.to_numpy(dtype=object, na_value=None)
+            # Plain ndarray hashing; the DataFrame helper is ~10 ms per call
+            first = first * HASH_MULTIPLIER + pd.util.hash_array(values, categorize=False)
+            second = second * HASH_MULTIPLIER + pd.util.hash_array(values, hash_key=SECOND_HASH_KEY, categorize=False)
+    rows = np.ascontiguousarray(np.stack([first, second], axis=1))
+    return [row.tobytes() for row in rows]
+
+# ==============================
+# 2. SQLite Store
+# ==============================
+class PredictionCache:
+    """
+    Bulk key-value store of model outputs in one SQLite file.
+
+    `max_bytes` bounds the live data in the file; once it is exceeded,
+    `evict_fraction` of that budget is freed by deleting the entries used
+    longest ago. Hits refresh an entry's last use at most every
+    `touch_interval` seconds, so reads rarely need the write lock.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, touch_interval=60.0, evict_fraction=0.1):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.evict_fraction = evict_fraction
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.errors = 0
+
+    def for_model(self, model_version):
+        """
+        The cache of one model version, as used by `cached_predict`.
+        """
+        return ModelCache(self, model_version)
+
+    def get_many(self, model_version, keys):
+        """
+        Cached values for `keys`, NaN where there is no entry. Errors (a
+        locked or unreadable file) count as misses.
+        """
+        values = np.full(len(keys), np.nan)
+        try:
+            connection = self._connection()
+            now = time.time()
+            found = {}
+            stale = []
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), CHUNK_SIZE):
+                chunk = unique_keys[start:start + CHUNK_SIZE]
+                rows = connection.execute(
+                    f"SELECT key, value, last_used FROM predictions "
+                    f"WHERE model_version = ? AND key IN ({', '.join('?' * len(chunk))})",
+                    [model_version, *chunk],
+                ).fetchall()
+                for key, value, last_used in rows:
+                    found[key] = value
+                    if now - last_used > self.touch_interval:
+                        stale.append(key)
+            if stale:
+                with connection:
+                    connection.executemany(
+                        "UPDATE predictions SET last_used = ? WHERE model_version = ? AND key = ?",
+                        [(now, model_version, key) for key in stale],
+                    )
+            for i, key in enumerate(keys):
+                if key in found:
+                    values[i] = found[key]
+        except sqlite3.Error:
+            self._count("errors", 1)
+        hits = int(np.count_nonzero(~np.isnan(values)))
+        self._count("hits", hits)
+        self._count("misses", len(keys) - hits)
+        return values
+
+    def put_many(self, model_version, keys, values):
+        """
+        Store `values` under `keys`, then evict if the file is over budget.
+        Errors are counted and otherwise ignored.
+        """
+        now = time.time()
+        try:
+            connection = self._connection()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO predictions (model_version, key, value, last_used) VALUES (?, ?, ?, ?)",
+                    [(model_version, key, float(value), now) for key, value in zip(keys, values)],
+                )
+            self._evict(connection)
+        except sqlite3.Error:
+            self._count("errors", 1)
+
+    def size_bytes(self):
+        """
+        Bytes of the file holding live entries (free pages excluded).
+        """
+        connection = self._connection()
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def metrics(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evicted": self.evicted, "errors": self.errors}
+
+    def _evict(self, connection):
+        used = self.size_bytes()
+        if used <= self.max_bytes:
+            return
+        # Entries are about the same size, so free the share of rows matching
+        # the share of bytes over the target
+        target = self.max_bytes * (1 - self.evict_fraction)
+        with connection:
+            rows = connection.execute("SELECT count(*) FROM predictions").fetchone()[0]
+            excess = max(1, int(np.ceil(rows * (1 - target / used))))
+            deleted = connection.execute(
+                "DELETE FROM predictions WHERE (model_version, key) IN "
+                "(SELECT model_version, key FROM predictions ORDER BY last_used LIMIT ?)",
+                (excess,),
+            ).rowcount
+        self._count("evicted", deleted)
+
+    def _connection(self):
+        # sqlite3 connections must stay on the thread that opened them
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def _count(self, counter, n):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+
+class ModelCache:
+    """
+    A `PredictionCache` bound to one model version.
+    """
+
+    def __init__(self, cache, model_version):
+        self.cache = cache
+        self.model_version = model_version
+
+    def predict(self, pipeline, features):
+        """
+        Raw model outputs for `features`: cached rows are read from disk and
+        only the others are scored and stored.
+        """
+        keys = feature_keys(features)
+        raw = self.cache.get_many(self.model_version, keys)
+        missing = np.isnan(raw)
+        if missing.any():
+            raw[missing] = predict(pipeline, features[missing])
+            self.cache.put_many(self.model_version, [key for key, m in zip(keys, missing) if m], raw[missing])
+        return raw
+
+
+class MemoryCache:
+    """
+    In-process LRU of the raw outputs of one model version, in front of an
+    optional `ModelCache`. Used by the Streamlit pages, where the same form
+    is often submitted again: repeats skip the model but still go through
+    `score_batch`, so the observers see every valuation.
+    """
+
+    def __init__(self, max_entries=10_000, backend=None):
+        self.max_entries = max_entries
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def predict(self, pipeline, features):
+        keys = feature_keys(features)
+        with self._lock:
+            raw = np.array([self._entries.get(key, np.nan) for key in keys])
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+        missing = np.isnan(raw)
+        if missing.any():
+            raw[missing] = cached_predict(self.backend, pipeline, features[missing])
+            with self._lock:
+                for key, value in zip([key for key, m in zip(keys, missing) if m], raw[missing]):
+                    self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return raw
+
+
+def cached_predict(cache, pipeline, features):
+    """
+    `predict` through a `ModelCache` or `MemoryCache`, or straight to the
+    model when `cache` is None.
+    """
+    if cache is None:
+        return predict(pipeline, features)
+    return cache.predict(pipeline, features)
+
+
+@lru_cache(maxsize=None)
+def open_prediction_cache():
+    """
+    The process-wide cache configured through PREDICTION_CACHE_PATH and
+    PREDICTION_CACHE_MAX_MB, or None when it is not enabled.
+    """
+    path = os.environ.get("PREDICTION_CACHE_PATH")
+    if not path:
+        return None
+    max_mb = os.environ.get("PREDICTION_CACHE_MAX_MB")
+    return PredictionCache(path, max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES)
+
+
+def open_model_cache(model_version):
+    """
+    The configured cache bound to `model_version`, or None when the cache is
+    not enabled or the model does not exist.
+    """
+    cache = open_prediction_cache()
+    if cache is None or model_version is None:
+        return None
+    return cache.for_model(model_version)
+
+
+def prometheus_cache(cache):
+    """
+    Render the cache counters in the Prometheus text format.
+    """
+    descriptions = {
+        "hits": "Rows served from the prediction cache",
+        "misses": "Rows looked up in the prediction cache and not found",
+        "evicted": "Entries evicted from the prediction cache",
+        "errors": "Prediction cache reads or writes that failed",
+    }
+    lines = []
+    for key, value in cache.metrics().items():
+        name = f"prediction_cache_{key}_total"
+        lines += [f"# HELP {name} {descriptions[key]}", f"# TYPE {name} counter", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,287 @@
+"""
+Reduced-footprint variant of the trained pipelines.
+
+`CompactEncoder` replaces the fitted ColumnTransformer: it writes the scaled
+numbers, flags and one-hot columns straight into a float32 CSR matrix, with
+the same values (and the same unstored zeros, which XGBoost reads as
+missing), without the object arrays, imputed copies and per-block sparse
+matrices the scikit-learn steps allocate. Encoded columns the booster never
+splits on are left out, and the booster's split indices are remapped to the
+narrower matrix, so the predictions do not change.
+
+The variant is stored next to the joblib artifact and served with
+PREDICTION_BACKEND=compact. Build it, check it against the original and
+compare peak memory and latency per batch size (from the streamlit
+directory) with:
+
+    python -m prediction.compact
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+from xgboost import XGBRegressor
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, HOUSE_MODEL_FILE, artifact_path
+
+# Largest allowed difference with the joblib pipeline, on the model's output scale
+EQUIVALENCE_TOLERANCE = 1e-6
+
+DEFAULT_BATCH_SIZES = [1, 32, 1024, 10_000]
+
+
+def compact_file_name(file_name):
+    return os.path.splitext(file_name)[0] + ".compact.joblib"
+
+# ==============================
+# 1. Sparse Encoder
+# ==============================
+class CompactEncoder(TransformerMixin, BaseEstimator):
+    """
+    Encode a DataFrame into the booster's (pruned) CSR feature matrix.
+
+    `numeric` lists (column, fill, mean, scale, output) per number or flag:
+    missing values become `fill` (when not None), then (value - mean) / scale
+    goes to output column `output`. `categorical` lists (column, fill,
+    categories, outputs) per one-hot encoded column, with `categories` sorted
+    and `outputs[i]` the output column of `categories[i]`. An output of -1
+    means the column is not kept; unknown categories set no column.
+    """
+
+    def __init__(self, numeric, categorical, n_features):
+        self.numeric = numeric
+        self.categorical = categorical
+        self.n_features = n_features
+
+    def fit(self, X=None, y=None):
+        return self
+
+    def transform(self, df):
+        rows, columns, values = [], [], []
+        row_ids = np.arange(len(df))
+
+        for column, fill, mean, scale, output in self.numeric:
+            if output < 0:
+                continue
+            value = df[column].to_numpy(dtype=float)
+            if fill is not None:
+                value = np.where(np.isnan(value), fill, value)
+            value = (value - mean) / scale
+            # Zeros are not stored, as in the scikit-learn sparse output
+            stored = value != 0
+            rows.append(row_ids[stored])
+            columns.append(np.full(np.count_nonzero(stored), output))
+            values.append(value[stored])
+
+        for column, fill, categories, outputs in self.categorical:
+            value = df[column].to_numpy(dtype=object)
+            if fill is not None:
+                value = np.where(pd.isna(value), fill, value)
+            position = np.minimum(np.searchsorted(categories, value), len(categories) - 1)
+            output = np.where(categories[position] == value, outputs[position], -1)
+            stored = output >= 0
+            rows.append(row_ids[stored])
+            columns.append(output[stored])
+            values.append(np.ones(np.count_nonzero(stored)))
+
+        return sparse.csr_matrix(
+            (np.concatenate(values).astype(np.float32), (np.concatenate(rows), np.concatenate(columns))),
+            shape=(len(df), self.n_features),
+            dtype=np.float32,
+        )
+
+
+def _column_steps(transformer):
+    if transformer == "passthrough":
+        return []
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps]
+    return [transformer]
+
+
+def compact_encoder(preprocessor, outputs):
+    """
+    A CompactEncoder equivalent to the fitted ColumnTransformer
+    `preprocessor`, writing its encoded column i to `outputs[i]` (-1 to
+    drop it).
+    """
+    numeric, categorical = [], []
+    offset = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or name == "remainder":
+            continue
+        steps = _column_steps(transformer)
+        fill, mean, scale = [None] * len(columns), np.zeros(len(columns)), np.ones(len(columns))
+        encoder = None
+        for step in steps:
+            if isinstance(step, SimpleImputer) and not step.add_indicator:
+                fill = list(step.statistics_)
+            elif isinstance(step, StandardScaler):
+                mean = step.mean_ if step.with_mean else mean
+                scale = step.scale_ if step.with_std else scale
+            elif isinstance(step, OneHotEncoder) and getattr(step, "infrequent_categories_", None) is None:
+                encoder = step
+            elif not (isinstance(step, FunctionTransformer) and step.func is None):
+                raise ValueError(f"Cannot compact the {type(step).__name__} step of {name!r}")
+
+        if encoder is None:
+            for i, column in enumerate(columns):
+                numeric.append((column, fill[i], float(mean[i]), float(scale[i]), int(outputs[offset + i])))
+            offset += len(columns)
+            continue
+
+        drop = encoder.drop_idx_ if encoder.drop_idx_ is not None else [None] * len(columns)
+        for i, column in enumerate(columns):
+            categories = np.asarray(encoder.categories_[i], dtype=object)
+            encoded = np.full(len(categories), -1)
+            kept = [j for j in range(len(categories)) if j != drop[i]]
+            encoded[kept] = outputs[offset:offset + len(kept)]
+            offset += len(kept)
+            order = np.argsort(categories)
+            categorical.append((column, fill[i], categories[order], encoded[order]))
+
+    return CompactEncoder(numeric, categorical, int(np.max(outputs)) + 1)
+
+# ==============================
+# 2. Booster Pruning
+# ==============================
+def prune_booster(model):
+    """
+    Copy of the fitted XGBRegressor `model` that only reads the features it
+    splits on. Returns the copy and, per original feature, its index in the
+    pruned feature space (-1 when never used).
+    """
+    config = json.loads(model.get_booster().save_raw("json"))
+    learner = config["learner"]
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError("Only gbtree boosters can be pruned")
+    trees = learner["gradient_booster"]["model"]["trees"]
+    n_features = int(learner["learner_model_param"]["num_feature"])
+
+    used = sorted({
+        index
+        for tree in trees
+        for index, left in zip(tree["split_indices"], tree["left_children"])
+        if left != -1
+    })
+    outputs = np.full(n_features, -1)
+    outputs[used] = np.arange(len(used))
+
+    for tree in trees:
+        tree["split_indices"] = [
+            int(outputs[index]) if left != -1 else 0
+            for index, left in zip(tree["split_indices"], tree["left_children"])
+        ]
+        tree["tree_param"]["num_feature"] = str(len(used))
+    learner["learner_model_param"]["num_feature"] = str(len(used))
+    for key in ["feature_names", "feature_types"]:
+        if learner.get(key):
+            learner[key] = [learner[key][i] for i in used]
+
+    pruned = XGBRegressor(**model.get_params())
+    pruned.load_model(bytearray(json.dumps(config).encode()))
+    return pruned, outputs
+
+
+def compact_pipeline(pipeline):
+    """
+    The reduced-footprint equivalent of a fitted ColumnTransformer +
+    XGBRegressor pipeline.
+    """
+    preprocessor, model = pipeline[0], pipeline[-1]
+    pruned, outputs = prune_booster(model)
+    return Pipeline([("encoder", compact_encoder(preprocessor, outputs)), ("model", pruned)])
+
+# ==============================
+# 3. Footprint Report
+# ==============================
+def measure(pipeline, df, repeats=20):
+    """
+    Peak memory traced by Python (NumPy, pandas, SciPy buffers) while
+    predicting `df` once, and the median latency over `repeats` calls.
+    """
+    from prediction.models import predict
+
+    predict(pipeline, df)
+    tracemalloc.start()
+    predict(pipeline, df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(pipeline, df)
+        durations.append(time.perf_counter() - start)
+    return peak, float(np.median(durations))
+
+
+def check_equivalence(pipeline, compact, df):
+    """
+    Largest absolute difference between both pipelines' predictions on `df`.
+    """
+    return float(np.max(np.abs(pipeline.predict(df) - compact.predict(df))))
+
+
+def main():
+    import joblib
+
+    from prediction.data import APARTMENT_FEATURES, load_apartments
+    from prediction.service import prepare_apartments
+    from prediction.validation import APARTMENT_SCHEMA
+    from prediction.warmup import synthetic_batch
+
+    parser = argparse.ArgumentParser(description="Build the reduced-footprint pipelines and report their savings.")
+    parser.add_argument("models", nargs="*", default=[APARTMENT_MODEL_FILE, HOUSE_MODEL_FILE])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    args = parser.parse_args()
+
+    reference = {APARTMENT_MODEL_FILE: load_apartments()[APARTMENT_FEATURES]}
+    batches = {APARTMENT_MODEL_FILE: lambda rows: prepare_apartments(synthetic_batch(APARTMENT_SCHEMA, rows))}
+    for file_name in args.models:
+        if not os.path.exists(artifact_path(file_name)):
+            print(f"Skipping {file_name}: not found in Trained_Models")
+            continue
+        pipeline = joblib.load(artifact_path(file_name))
+        compact = compact_pipeline(pipeline)
+        width = pipeline[0].transform(reference[file_name].head(1)).shape[1] if file_name in reference else None
+        print(f"{file_name}: {compact[0].n_features} of {width or '?'} encoded columns kept")
+
+        if file_name in reference:
+            difference = check_equivalence(pipeline, compact, reference[file_name])
+            if difference > EQUIVALENCE_TOLERANCE:
+                raise SystemExit(f"{file_name}: compact predictions differ by {difference:.2e}, not saved")
+            print(f"  max difference {difference:.2e} on {len(reference[file_name])} rows")
+        output = artifact_path(compact_file_name(file_name))
+        joblib.dump(compact, output)
+        print(f"  wrote {output}")
+
+        if file_name not in batches:
+            continue
+        print(f"  {'rows':>7}{'peak KiB':>22}{'latency ms':>24}")
+        for rows in args.batch_sizes:
+            df = batches[file_name](rows)
+            peak, latency = measure(pipeline, df)
+            compact_peak, compact_latency = measure(compact, df)
+            print(
+                f"  {rows:>7}{peak / 1024:>10.0f} ->{compact_peak / 1024:>8.0f}"
+                f" ({1 - compact_peak / peak:>4.0%}){latency * 1000:>10.2f} ->{compact_latency * 1000:>7.2f}"
+                f" ({1 - compact_latency / latency:>4.0%})"
+            )
+
+
+if __name__ == "__main__":
+    # Run the imported module's main, so the pickled encoder is referenced as
+    # prediction.compact.CompactEncoder and not as a class of __main__
+    from prediction.compact import main
+
+    main()
@@ -0,0 +1,90 @@
+from functools import lru_cache
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from prediction.artifacts import data_path
+
+# ==============================
+# Model Feature Sets
+# ==============================
+# Same feature lists as the apartment training notebook (Data Folder/models.ipynb)
+APARTMENT_NUM_FEATURES = ["total_area_sqm", "construction_year", "nbr_bedrooms", "terrace_sqm"]
+APARTMENT_DUMMY_FEATURES = ["fl_furnished", "fl_terrace", "fl_double_glazing"]
+APARTMENT_CAT_FEATURES = ["state_building", "zip_code", "province", "heating_type"]
+APARTMENT_FEATURES = APARTMENT_NUM_FEATURES + APARTMENT_DUMMY_FEATURES + APARTMENT_CAT_FEATURES
+
+# Fields a client sends for an apartment; the service derives `province`
+# (and `fl_terrace` when missing) from them
+APARTMENT_INPUT_FIELDS = [
+    "zip_code", "total_area_sqm", "nbr_bedrooms", "terrace_sqm", "construction_year",
+    "state_building", "heating_type", "fl_furnished", "fl_double_glazing", "fl_terrace",
+]
+
+# The apartment listings name the Brussels region "Brussels"; the other
+# provinces have the names of prediction.zip_codes.PROVINCE_RANGES
+APARTMENT_PROVINCE_NAMES = {"Brussels Capital Region": "Brussels"}
+
+# Columns the house page sends to the house pipeline
+HOUSE_FEATURES = [
+    "zip_code", "province", "total_area_sqm", "nbr_bedrooms", "construction_year",
+    "state_building", "latitude", "longitude", "garden_sqm", "heating_type",
+    "terrace_sqm", "fl_terrace", "fl_floodzone",
+]
+
+# Same split as the training notebook (Data Folder/models.ipynb)
+TEST_SIZE = 0.2
+RANDOM_STATE = 535
+
+# The notebook keeps the 50 most frequent values of each categorical feature
+# in the training split and files all others, missing values included, under
+# "Other"
+TOP_CATEGORIES = 50
+OTHER_CATEGORY = "Other"
+
+# ==============================
+# Training Data
+# ==============================
+def load_apartments(file_name="apartments_sqm.csv"):
+    """
+    Load the apartment listings with `zip_code` as a 4-digit string, the way
+    the training notebook feeds it to the pipeline.
+    """
+    df = pd.read_csv(data_path(file_name))
+    df["zip_code"] = df["zip_code"].astype(str).str.zfill(4)
+    return df
+
+
+def split_apartments(df):
+    """
+    The notebook's train/test split of `df`, as a (train, test) pair.
+    """
+    return train_test_split(df, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+
+def top_categories(train, columns, top=TOP_CATEGORIES):
+    """
+    The `top` most frequent values of each of `columns` in `train`.
+    """
+    return {column: frozenset(train[column].value_counts().nlargest(top).index) for column in columns}
+
+
+def bucket_categories(df, categories):
+    """
+    Return a copy of `df` where the values of each column of `categories`
+    that are not among its kept values become "Other", and the rest strings.
+    """
+    df = df.copy()
+    for column, kept in categories.items():
+        df[column] = df[column].where(df[column].isin(kept), OTHER_CATEGORY).astype(str)
+    return df
+
+
+@lru_cache(maxsize=None)
+def apartment_categories():
+    """
+    The kept values of the apartment categorical features, taken from the
+    notebook's training split: the vocabulary the apartment model was fit on.
+    """
+    train, _ = split_apartments(load_apartments())
+    return top_categories(train, APARTMENT_CAT_FEATURES)
@@ -0,0 +1,190 @@
+"""
+Cross-validated evaluation of the trained pipelines.
+
+Refits a copy of a pipeline on each of k folds in parallel worker
+processes, after the training notebook's preprocessing (rare categories
+bucketed into "Other"), scores the out-of-fold predictions in euros (after
+`expm1` for the log-price apartment model), and writes the metrics, broken
+down by province and price band, to a JSON file next to the artifact. The
+pages read that file when they load the model, if it was computed for the
+artifact they load. Rebuild it from the streamlit directory with:
+
+    python -m prediction.evaluation
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, median_absolute_error, r2_score
+from sklearn.model_selection import KFold
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, artifact_path
+from prediction.data import RANDOM_STATE, bucket_categories, top_categories
+from prediction.models import model_version
+from prediction.threading_policy import available_cpus
+
+METRICS_SUFFIX = ".metrics.json"
+
+PRICE_BANDS = [0, 200_000, 300_000, 400_000, 500_000, np.inf]
+PRICE_BAND_LABELS = ["< €200k", "€200k-300k", "€300k-400k", "€400k-500k", "≥ €500k"]
+
+# ==============================
+# 1. Metrics
+# ==============================
+def regression_metrics(actual, predicted):
+    """
+    R², mean, median and percentage errors of prices in EUR.
+    """
+    return {
+        "rows": int(len(actual)),
+        "r2": float(r2_score(actual, predicted)) if len(actual) > 1 else None,
+        "mae": float(mean_absolute_error(actual, predicted)),
+        "median_ae": float(median_absolute_error(actual, predicted)),
+        "mape": float(mean_absolute_percentage_error(actual, predicted) * 100),
+    }
+
+
+def grouped_metrics(actual, predicted, groups):
+    return {
+        str(group): regression_metrics(actual[mask], predicted[mask])
+        for group in pd.unique(groups)
+        if (mask := (groups == group)).any()
+    }
+
+# ==============================
+# 2. Parallel k-fold
+# ==============================
+def _fit_fold(pipeline, X, y, train_index, test_index, categorical):
+    # Same bucketing as the serving path, with the fold's training part as
+    # the training split
+    categories = top_categories(X.iloc[train_index], categorical)
+    train, test = bucket_categories(X.iloc[train_index], categories), bucket_categories(X.iloc[test_index], categories)
+    model = clone(pipeline)
+    model.fit(train, y[train_index])
+    return test_index, model.predict(test)
+
+
+def cross_validate(pipeline, X, prices, log_target, folds=5, max_workers=None, categorical=()):
+    """
+    Out-of-fold price predictions in EUR and the metrics of each fold.
+
+    Each fold refits an unfitted copy of `pipeline` (same steps and
+    hyperparameters) in its own process, on log1p(prices) when `log_target`.
+    The `categorical` columns are bucketed like the serving path does (see
+    prediction.data.bucket_categories), with the most frequent values of the
+    fold's training part like the notebook takes those of its split.
+    """
+    prices = np.asarray(prices, dtype=float)
+    y = np.log1p(prices) if log_target else prices
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE).split(X))
+
+    predicted = np.full(len(prices), np.nan)
+    fold_metrics = []
+    # Spawned workers do not inherit the parent's xgboost/OpenMP thread state
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers or min(folds, available_cpus()), mp_context=context) as pool:
+        futures = [pool.submit(_fit_fold, pipeline, X, y, train, test, categorical) for train, test in splits]
+        for future in futures:
+            test_index, raw = future.result()
+            predicted[test_index] = np.expm1(raw) if log_target else raw
+            fold_metrics.append(regression_metrics(prices[test_index], predicted[test_index]))
+    return predicted, fold_metrics
+
+
+def evaluation_report(pipeline, X, prices, provinces, log_target, folds=5, max_workers=None, categorical=()):
+    """
+    Cross-validated metrics in EUR, overall, per fold, per province and per
+    price band (of the actual price).
+    """
+    prices = np.asarray(prices, dtype=float)
+    predicted, fold_metrics = cross_validate(pipeline, X, prices, log_target, folds, max_workers, categorical)
+    bands = pd.cut(prices, PRICE_BANDS, labels=PRICE_BAND_LABELS, right=False).astype(str)
+    return {
+        "folds": folds,
+        "overall": regression_metrics(prices, predicted),
+        "per_fold": fold_metrics,
+        "by_province": grouped_metrics(prices, predicted, np.asarray(provinces)),
+        "by_price_band": {
+            band: metrics
+            for band, metrics in sorted(
+                grouped_metrics(prices, predicted, bands).items(), key=lambda item: PRICE_BAND_LABELS.index(item[0])
+            )
+        },
+    }
+
+# ==============================
+# 3. Metadata File
+# ==============================
+def metrics_file_name(model_file):
+    """
+    Name of the metrics file stored next to `model_file`.
+    """
+    return os.path.splitext(model_file)[0] + METRICS_SUFFIX
+
+
+def save_metrics(model_file, report, model_version):
+    with open(artifact_path(metrics_file_name(model_file)), "w") as f:
+        json.dump(
+            {
+                "model_version": model_version,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                **report,
+            },
+            f,
+            indent=2,
+            ensure_ascii=False,
+        )
+
+
+def load_metrics(model_file):
+    """
+    The evaluation report stored next to `model_file`, or None when it has
+    not been computed or was computed for another version of the artifact.
+    """
+    try:
+        with open(artifact_path(metrics_file_name(model_file)), "r") as f:
+            report = json.load(f)
+    except FileNotFoundError:
+        return None
+    # Metrics describe the joblib artifact the ONNX and compact ones are built from
+    if report.get("model_version") != model_version(model_file, "joblib"):
+        return None
+    return report
+
+
+def main():
+    from prediction.data import APARTMENT_CAT_FEATURES, APARTMENT_FEATURES, load_apartments
+    from prediction.models import load_pipeline
+
+    parser = argparse.ArgumentParser(description="Cross-validate the apartment pipeline and store its metrics.")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    # Same features, target and preprocessing as the training notebook
+    df = load_apartments()
+    pipeline = load_pipeline(APARTMENT_MODEL_FILE, backend="joblib")
+    start = time.perf_counter()
+    report = evaluation_report(
+        pipeline, df[APARTMENT_FEATURES], df["price"], df["province"],
+        log_target=True, folds=args.folds, max_workers=args.workers, categorical=APARTMENT_CAT_FEATURES,
+    )
+    save_metrics(APARTMENT_MODEL_FILE, report, model_version(APARTMENT_MODEL_FILE, "joblib"))
+
+    overall = report["overall"]
+    print(
+        f"{args.folds}-fold in {time.perf_counter() - start:.1f} s: R² {overall['r2']:.4f}, "
+        f"MAE €{overall['mae']:,.0f}, median AE €{overall['median_ae']:,.0f}"
+    )
+    print(f"Wrote {metrics_file_name(APARTMENT_MODEL_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import hashlib
+import os
+from functools import lru_cache
+
+import joblib
+
+from prediction.artifacts import artifact_path
+from prediction.threading_policy import ThreadingPolicy
+
+# Inference backend, "joblib" (scikit-learn + xgboost), "onnx" (onnxruntime) or
+# "compact" (sparse encoder + pruned booster, see prediction.compact).
+# Set PREDICTION_BACKEND to switch the Streamlit pages and the API.
+BACKENDS = ["joblib", "onnx", "compact"]
+DEFAULT_BACKEND = os.environ.get("PREDICTION_BACKEND", "joblib")
+
+# Shared by every prediction call in this process, so the policy sees the
+# real number of concurrent calls.
+threading_policy = ThreadingPolicy()
+
+
+def pipeline_path(file_name, backend=None):
+    """
+    Path of the file `load_pipeline` reads for `file_name` with `backend`.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown prediction backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "onnx":
+        from prediction.onnx_backend import onnx_file_name
+
+        return artifact_path(onnx_file_name(file_name))
+    if backend == "compact":
+        from prediction.compact import compact_file_name
+
+        return artifact_path(compact_file_name(file_name))
+    return artifact_path(file_name)
+
+
+def load_pipeline(file_name, backend=None):
+    """
+    Load a trained pipeline from the Trained_Models directory.
+
+    With the "onnx" or "compact" backend the `.onnx` or `.compact.joblib`
+    file next to the joblib artifact is loaded instead (see
+    prediction.onnx_backend and prediction.compact).
+    """
+    backend = backend or DEFAULT_BACKEND
+    path = pipeline_path(file_name, backend)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model file not found at: {path}")
+    if backend == "onnx":
+        from prediction.onnx_backend import OnnxPipeline
+
+        return OnnxPipeline(path)
+    return joblib.load(path)
+
+
+@lru_cache(maxsize=None)
+def model_version(file_name, backend=None):
+    """
+    Identify the artifact a prediction came from: the loaded file's name and
+    the first 12 hex digits of its SHA-256, or None when it does not exist.
+    """
+    path = pipeline_path(file_name, backend)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return f"{os.path.basename(path)}@{digest[:12]}"
+
+
+def predict(pipeline, df):
+    """
+    Score a batch of properties with `pipeline` on the prediction path.
+
+    Returns the raw model output; the apartment model predicts log prices.
+    """
+    return threading_policy.predict(pipeline, df)
@@ -0,0 +1,271 @@
+"""
+Streaming drift monitor for live predictions.
+
+Every scored batch updates fixed-size sketches: a histogram per numeric
+feature and for the predicted price (bins from the training quantiles) and a
+bounded counter per categorical feature (the training categories plus one
+"other" slot). Memory does not grow with traffic, and the sketches are
+compared with the training distribution through the Population Stability
+Index (PSI). Build the baseline from the streamlit directory with:
+
+    python -m prediction.monitoring
+"""
+import argparse
+import json
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, artifact_path
+
+APARTMENT_BASELINE_FILE = "apartments_drift_baseline.json"
+NUMERIC_FEATURES = ["total_area_sqm", "construction_year", "nbr_bedrooms", "terrace_sqm"]
+CATEGORICAL_FEATURES = ["zip_code", "state_building", "heating_type"]
+PREDICTION = "predicted_price"
+
+# Rules of thumb for PSI: below 0.1 stable, 0.1-0.25 moderate shift, above 0.25 drift
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+
+# ==============================
+# 1. Sketches
+# ==============================
+class NumericSketch:
+    """
+    Histogram over fixed bin edges, with a last bin for missing values.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.missing_bin = len(self.edges) + 1
+        self.counts = np.zeros(len(self.edges) + 2, dtype=np.int64)
+
+    def bins(self, values):
+        values = np.asarray(values, dtype=float)
+        bins = np.searchsorted(self.edges, values, side="right")
+        bins[np.isnan(values)] = self.missing_bin
+        return bins
+
+    def add(self, bins):
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+
+    def update(self, values):
+        self.add(self.bins(values))
+
+
+class CategoricalSketch:
+    """
+    Counter over a fixed set of categories, with a last slot for all others.
+    """
+
+    # Below this many values a dict lookup beats building a hash-table probe
+    VECTORIZE_ABOVE = 256
+
+    def __init__(self, categories):
+        self.categories = pd.Index(categories)
+        self.slots = {category: slot for slot, category in enumerate(categories)}
+        self.other_slot = len(self.categories)
+        self.counts = np.zeros(len(self.categories) + 1, dtype=np.int64)
+
+    def bins(self, values):
+        if len(values) <= self.VECTORIZE_ABOVE:
+            return np.array([self.slots.get(value, self.other_slot) for value in values], dtype=np.intp)
+        slots = self.categories.get_indexer(np.asarray(values, dtype=object))
+        slots[slots < 0] = self.other_slot
+        return slots
+
+    def add(self, bins):
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+
+    def update(self, values):
+        self.add(self.bins(values))
+
+
+def psi(expected, actual, epsilon=1e-4):
+    """
+    Population Stability Index between two distributions over the same bins.
+    """
+    expected = np.clip(np.asarray(expected, dtype=float), epsilon, None)
+    actual = np.clip(np.asarray(actual, dtype=float), epsilon, None)
+    expected, actual = expected / expected.sum(), actual / actual.sum()
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+# ==============================
+# 2. Baseline
+# ==============================
+def build_baseline(df, predicted_prices, bins=10, top_categories=50):
+    """
+    Describe the training distribution: quantile bin edges and expected
+    proportions for the numeric features and the predicted price, and the
+    `top_categories` most frequent values per categorical feature.
+    """
+    def numeric(values):
+        values = np.asarray(values, dtype=float)
+        edges = np.unique(np.nanquantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        sketch = NumericSketch(edges)
+        sketch.update(values)
+        return {"edges": edges.tolist(), "expected": (sketch.counts / sketch.counts.sum()).tolist()}
+
+    def categorical(values):
+        values = pd.Series(values).astype(str)
+        categories = values.value_counts().index[:top_categories].tolist()
+        sketch = CategoricalSketch(categories)
+        sketch.update(values)
+        return {"categories": categories, "expected": (sketch.counts / sketch.counts.sum()).tolist()}
+
+    return {
+        "rows": len(df),
+        "numeric": {column: numeric(df[column]) for column in NUMERIC_FEATURES},
+        "categorical": {column: categorical(df[column]) for column in CATEGORICAL_FEATURES},
+        "prediction": numeric(predicted_prices),
+    }
+
+
+def load_baseline(file_name=APARTMENT_BASELINE_FILE):
+    with open(artifact_path(file_name), "r") as f:
+        return json.load(f)
+
+
+def load_monitor(baseline_file):
+    """
+    A DriftMonitor for `baseline_file`, or None when it has not been built.
+    """
+    try:
+        return DriftMonitor(load_baseline(baseline_file))
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def drift_monitors():
+    """
+    The process-wide drift monitor per property type (None without a
+    training baseline; only the apartment model has one).
+    """
+    return {"APARTMENT": load_monitor(APARTMENT_BASELINE_FILE), "HOUSE": None}
+
+# ==============================
+# 3. Live Monitor
+# ==============================
+def _column_arrays(df, columns, small_batch=64):
+    """
+    The given columns of `df` as numpy arrays.
+
+    Selecting a column has a fixed cost that dominates on the one-row batches
+    of the interactive routes, so small frames are converted in one go.
+    """
+    if len(df) > small_batch:
+        return {column: df[column].to_numpy() for column in columns}
+    values = df.to_numpy(dtype=object)
+    position = {column: i for i, column in enumerate(df.columns)}
+    return {column: values[:, position[column]] for column in columns}
+
+
+class DriftMonitor:
+    """
+    Fixed-memory sketches of live inputs and predictions, scored against a
+    training baseline.
+    """
+
+    def __init__(self, baseline):
+        self.baseline = baseline
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.rows = 0
+            self.numeric = {c: NumericSketch(b["edges"]) for c, b in self.baseline["numeric"].items()}
+            self.categorical = {c: CategoricalSketch(b["categories"]) for c, b in self.baseline["categorical"].items()}
+            self.prediction = NumericSketch(self.baseline["prediction"]["edges"])
+
+    def update(self, features, predicted_prices):
+        """
+        Add a scored batch: `features` holds the model inputs of the rows in
+        `predicted_prices`.
+        """
+        columns = _column_arrays(features, list(self.numeric) + list(self.categorical))
+
+        # Bin outside the lock, only the counter updates are serialized
+        numeric_bins = {c: s.bins(columns[c]) for c, s in self.numeric.items()}
+        categorical_bins = {c: s.bins(columns[c]) for c, s in self.categorical.items()}
+        prediction_bins = self.prediction.bins(predicted_prices)
+        with self._lock:
+            self.rows += len(prediction_bins)
+            for column, bins in numeric_bins.items():
+                self.numeric[column].add(bins)
+            for column, bins in categorical_bins.items():
+                self.categorical[column].add(bins)
+            self.prediction.add(prediction_bins)
+
+    def scores(self, min_rows=100):
+        """
+        PSI per monitored feature and for the predicted price, with a status.
+        Scores are None until `min_rows` predictions have been seen.
+        """
+        with self._lock:
+            sketches = {
+                **{c: (self.baseline["numeric"][c]["expected"], s.counts.copy()) for c, s in self.numeric.items()},
+                **{c: (self.baseline["categorical"][c]["expected"], s.counts.copy()) for c, s in self.categorical.items()},
+                PREDICTION: (self.baseline["prediction"]["expected"], self.prediction.counts.copy()),
+            }
+            rows = self.rows
+
+        result = {"rows": rows, "features": {}}
+        for name, (expected, counts) in sketches.items():
+            score = psi(expected, counts) if rows >= min_rows else None
+            if score is None:
+                status = "insufficient data"
+            else:
+                status = "drift" if score >= PSI_DRIFT else "warning" if score >= PSI_WARNING else "stable"
+            result["features"][name] = {"psi": score, "status": status}
+        return result
+
+
+def prometheus_drift(monitors, min_rows=100):
+    """
+    Render the PSI of named monitors in the Prometheus text format.
+    """
+    lines = [
+        "# HELP prediction_drift_rows Predictions added to the drift monitor",
+        "# TYPE prediction_drift_rows counter",
+    ]
+    scores = {model: monitor.scores(min_rows) for model, monitor in monitors.items()}
+    for model, result in scores.items():
+        lines.append(f'prediction_drift_rows{{model="{model}"}} {result["rows"]}')
+    lines += [
+        "# HELP prediction_drift_psi Population Stability Index against the training data",
+        "# TYPE prediction_drift_psi gauge",
+    ]
+    for model, result in scores.items():
+        for feature, score in result["features"].items():
+            if score["psi"] is not None:
+                lines.append(f'prediction_drift_psi{{model="{model}",feature="{feature}"}} {score["psi"]:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    from prediction.data import APARTMENT_INPUT_FIELDS, load_apartments
+    from prediction.models import load_pipeline
+    from prediction.service import prepare_apartments, score_apartments
+    from prediction.validation import APARTMENT_SCHEMA, valid_rows, validate_batch
+
+    parser = argparse.ArgumentParser(description="Build the apartment drift baseline from the training data.")
+    parser.add_argument("--output", default=artifact_path(APARTMENT_BASELINE_FILE))
+    args = parser.parse_args()
+
+    # Replay the listings the service would accept through the serving path,
+    # so the baseline sees the same normalized features and prices as live
+    # traffic and rejected inputs (e.g. a missing area) do not show up as drift
+    df = load_apartments()[APARTMENT_INPUT_FIELDS]
+    df = df[valid_rows(validate_batch(df, APARTMENT_SCHEMA))]
+    predicted_prices, _ = score_apartments(load_pipeline(APARTMENT_MODEL_FILE), df, observers=())
+    with open(args.output, "w") as f:
+        json.dump(build_baseline(prepare_apartments(df), predicted_prices), f)
+    print(f"Wrote {args.output} from {len(df)} listings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Scoring observers shared by every entry point of a process.
+
+`score_apartments` and `score_houses` pass each scored batch to
+`default_observers(kind)` unless the caller gives its own, so predictions
+made through the API and through the Streamlit pages reach the same drift
+monitors and audit log. Offline jobs (warm-up, baselines, evaluation) pass
+`observers=()` to keep their synthetic or training rows out of them.
+"""
+from functools import lru_cache
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, HOUSE_MODEL_FILE
+from prediction.audit import open_audit_log
+from prediction.models import model_version
+from prediction.monitoring import drift_monitors
+
+MODEL_FILES = {"APARTMENT": APARTMENT_MODEL_FILE, "HOUSE": HOUSE_MODEL_FILE}
+
+
+@lru_cache(maxsize=None)
+def default_observers(kind):
+    """
+    The observers of property type `kind` (APARTMENT or HOUSE): the audit
+    log writer of its model and its drift monitor, when it has a baseline.
+    """
+    observers = [open_audit_log().writer(kind.lower(), model_version(MODEL_FILES[kind]))]
+    monitor = drift_monitors()[kind]
+    if monitor is not None:
+        observers.append(monitor)
+    return tuple(observers)
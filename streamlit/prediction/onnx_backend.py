@@ -0,0 +1,174 @@
+"""
+ONNX export of the trained pipelines and an onnxruntime CPU backend.
+
+Exporting needs skl2onnx and onnxmltools on top of onnxruntime. Export every
+pipeline in Trained_Models and check it against the joblib version with
+(from the streamlit directory):
+
+    python -m prediction.onnx_backend
+"""
+import argparse
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import onnxruntime as rt
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, HOUSE_MODEL_FILE, artifact_path
+
+# Largest allowed difference with the joblib pipeline, on the model's output scale
+EQUIVALENCE_TOLERANCE = 1e-4
+
+
+def onnx_file_name(file_name):
+    return os.path.splitext(file_name)[0] + ".onnx"
+
+# ==============================
+# 1. Export
+# ==============================
+def _register_xgboost_converter():
+    from onnxmltools.convert.xgboost.operator_converters.XGBoost import convert_xgboost
+    from skl2onnx import update_registered_converter
+    from skl2onnx.common.shape_calculator import calculate_linear_regressor_output_shapes
+    from xgboost import XGBRegressor
+
+    update_registered_converter(
+        XGBRegressor, "XGBoostXGBRegressor", calculate_linear_regressor_output_shapes, convert_xgboost
+    )
+
+
+def _treat_zeros_as_missing(onnx_model):
+    """
+    The preprocessors output a sparse matrix and XGBoost treats every entry
+    that is not stored in it as missing, not as 0. The ONNX graph is dense,
+    so turn its zeros into NaN right before the tree ensemble.
+    """
+    from onnx import helper, numpy_helper
+
+    graph = onnx_model.graph
+    position, trees = next(
+        (i, node) for i, node in enumerate(graph.node) if node.op_type == "TreeEnsembleRegressor"
+    )
+    features = trees.input[0]
+    graph.initializer.extend([
+        numpy_helper.from_array(np.array(0, dtype=np.float32), "sparse_zero"),
+        numpy_helper.from_array(np.array(np.nan, dtype=np.float32), "sparse_missing"),
+    ])
+    graph.node.insert(position, helper.make_node("Where", ["is_zero", "sparse_missing", features], ["features_missing"]))
+    graph.node.insert(position, helper.make_node("Equal", [features, "sparse_zero"], ["is_zero"]))
+    trees.input[0] = "features_missing"
+
+
+def export_pipeline(pipeline):
+    """
+    Convert a fitted ColumnTransformer + XGBRegressor pipeline to ONNX.
+
+    Columns that go through a OneHotEncoder become string inputs, every other
+    column a float input. ONNX strings cannot be NaN, so categorical imputers
+    are exported to fill empty strings instead and OnnxPipeline sends missing
+    categories as "". StandardScaler is computed in double precision so values
+    next to a split threshold land on the same side as in scikit-learn.
+    """
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType, StringTensorType
+
+    _register_xgboost_converter()
+    pipeline = copy.deepcopy(pipeline)
+    preprocessor = pipeline[0]
+
+    inputs = []
+    options = {}
+    for _, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop":
+            continue
+        steps = [step for _, step in getattr(transformer, "steps", [("", transformer)])]
+        categorical = any(isinstance(step, OneHotEncoder) for step in steps)
+        tensor_type = StringTensorType if categorical else FloatTensorType
+        inputs.extend((column, tensor_type([None, 1])) for column in columns)
+        for step in steps:
+            if categorical and isinstance(step, SimpleImputer):
+                step.missing_values = ""
+            if isinstance(step, StandardScaler):
+                options[id(step)] = {"div": "div_cast"}
+
+    onnx_model = convert_sklearn(
+        pipeline,
+        initial_types=inputs,
+        target_opset={"": 17, "ai.onnx.ml": 3},
+        options=options,
+    )
+    if getattr(preprocessor, "sparse_output_", False):
+        _treat_zeros_as_missing(onnx_model)
+    return onnx_model
+
+# ==============================
+# 2. onnxruntime Backend
+# ==============================
+class OnnxPipeline:
+    """
+    Serve an exported pipeline through onnxruntime with the same
+    `predict(df)` interface as the scikit-learn pipeline.
+    """
+
+    def __init__(self, path, intra_op_threads=0):
+        options = rt.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        self.session = rt.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.string_inputs = [i.name for i in self.session.get_inputs() if i.type == "tensor(string)"]
+        self.float_inputs = [i.name for i in self.session.get_inputs() if i.type == "tensor(float)"]
+        self.output_name = self.session.get_outputs()[0].name
+
+    def feeds(self, df):
+        feeds = {
+            column: pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float32).reshape(-1, 1)
+            for column in self.float_inputs
+        }
+        for column in self.string_inputs:
+            feeds[column] = df[column].fillna("").astype(str).to_numpy().reshape(-1, 1)
+        return feeds
+
+    def predict(self, df):
+        return self.session.run([self.output_name], self.feeds(df))[0].ravel()
+
+
+def check_equivalence(pipeline, onnx_pipeline, df):
+    """
+    Largest absolute difference between both backends' predictions on `df`.
+    """
+    return float(np.max(np.abs(pipeline.predict(df) - onnx_pipeline.predict(df))))
+
+
+def main():
+    import joblib
+
+    from prediction.data import APARTMENT_FEATURES, load_apartments
+
+    parser = argparse.ArgumentParser(description="Export the trained pipelines to ONNX.")
+    parser.add_argument("models", nargs="*", default=[APARTMENT_MODEL_FILE, HOUSE_MODEL_FILE])
+    args = parser.parse_args()
+
+    reference = {APARTMENT_MODEL_FILE: load_apartments()[APARTMENT_FEATURES]}
+    for file_name in args.models:
+        if not os.path.exists(artifact_path(file_name)):
+            print(f"Skipping {file_name}: not found in Trained_Models")
+            continue
+        pipeline = joblib.load(artifact_path(file_name))
+        output = artifact_path(onnx_file_name(file_name))
+        with open(output, "wb") as f:
+            f.write(export_pipeline(pipeline).SerializeToString())
+
+        if file_name not in reference:
+            print(f"Wrote {output} (no reference data to check equivalence)")
+            continue
+        difference = check_equivalence(pipeline, OnnxPipeline(output), reference[file_name])
+        if difference > EQUIVALENCE_TOLERANCE:
+            os.remove(output)
+            raise SystemExit(f"{file_name}: ONNX predictions differ by {difference:.2e}, export discarded")
+        print(f"Wrote {output} (max difference {difference:.2e} on {len(reference[file_name])} rows)")
+
+
+if __name__ == "__main__":
+    main()
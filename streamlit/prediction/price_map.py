@@ -0,0 +1,125 @@
+"""
+Offline job behind the model description page.
+
+Scores one reference apartment in every Belgian ZIP code and the held-out
+split of the training data, and stores both as small Parquet artifacts the
+page reads without running the model. Rebuild them from the streamlit
+directory with:
+
+    python -m prediction.price_map
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, artifact_path
+from prediction.data import APARTMENT_INPUT_FIELDS, load_apartments, split_apartments
+from prediction.models import load_pipeline, model_version
+from prediction.service import score_apartments
+from prediction.zip_codes import load_zip_table, provinces_from_zip_codes
+
+APARTMENT_PRICE_MAP_FILE = "apartments_price_map.parquet"
+APARTMENT_HOLDOUT_FILE = "apartments_holdout.parquet"
+
+# The defaults of the apartment prediction form
+REFERENCE_APARTMENT = {
+    "total_area_sqm": 75,
+    "nbr_bedrooms": 2,
+    "terrace_sqm": 0,
+    "construction_year": 2000,
+    "state_building": "GOOD",
+    "heating_type": "GAS",
+    "fl_furnished": 0,
+    "fl_double_glazing": 1,
+}
+
+# ==============================
+# 1. Reference Price per ZIP Code
+# ==============================
+def score_zip_codes(pipeline, profile=REFERENCE_APARTMENT, zip_table=None):
+    """
+    Price the reference `profile` in every ZIP code of zipcode-belgium.json,
+    in one batch. Returns one row per ZIP with its location and the predicted
+    price and price per sqm.
+    """
+    table = zip_table or load_zip_table()
+    codes = np.flatnonzero(table["known"])
+    df = pd.DataFrame({"zip_code": [f"{code:04d}" for code in codes]})
+    for column, value in profile.items():
+        df[column] = value
+
+    prices, _ = score_apartments(pipeline, df, observers=())
+    return pd.DataFrame({
+        "zip_code": df["zip_code"],
+        "city": table["city"][codes],
+        "province": provinces_from_zip_codes(df["zip_code"]),
+        "latitude": table["lat"][codes],
+        "longitude": table["lng"][codes],
+        "price": prices,
+        "price_per_sqm": prices / profile["total_area_sqm"],
+    }).dropna(subset=["price"])
+
+# ==============================
+# 2. Held-out Comparison Table
+# ==============================
+def holdout_comparison(pipeline, df):
+    """
+    Actual against predicted prices on the notebook's test split of `df`.
+    Listings the service would reject (e.g. an area above 500 sqm) are left out.
+    """
+    _, test = split_apartments(df)
+    prices, _ = score_apartments(pipeline, test[APARTMENT_INPUT_FIELDS], observers=())
+    comparison = pd.DataFrame({
+        "zip_code": test["zip_code"].to_numpy(),
+        "province": test["province"].to_numpy(),
+        "total_area_sqm": test["total_area_sqm"].to_numpy(),
+        "actual_price": test["price"].to_numpy(dtype=float),
+        "predicted_price": prices,
+    }).dropna(subset=["predicted_price"])
+    comparison["absolute_error"] = (comparison["predicted_price"] - comparison["actual_price"]).abs()
+    comparison["percentage_error"] = comparison["absolute_error"] / comparison["actual_price"] * 100
+    return comparison.reset_index(drop=True)
+
+# ==============================
+# 3. Artifacts
+# ==============================
+def save_table(df, file_name, version):
+    """
+    Write `df` to Trained_Models as Parquet, recording the model version the
+    table was computed with in the file's metadata.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"model_version": version.encode()})
+    pq.write_table(table, artifact_path(file_name), compression="zstd")
+
+
+def load_table(file_name):
+    """
+    Read a table written by `save_table`; returns the DataFrame and the model
+    version it was computed with.
+    """
+    table = pq.read_table(artifact_path(file_name))
+    return table.to_pandas(), table.schema.metadata.get(b"model_version", b"").decode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the price map and held-out comparison artifacts.")
+    parser.parse_args()
+
+    pipeline = load_pipeline(APARTMENT_MODEL_FILE, backend="joblib")
+    version = model_version(APARTMENT_MODEL_FILE, "joblib")
+
+    price_map = score_zip_codes(pipeline)
+    save_table(price_map, APARTMENT_PRICE_MAP_FILE, version)
+    print(f"Wrote {APARTMENT_PRICE_MAP_FILE}: {len(price_map)} ZIP codes")
+
+    comparison = holdout_comparison(pipeline, load_apartments())
+    save_table(comparison, APARTMENT_HOLDOUT_FILE, version)
+    print(f"Wrote {APARTMENT_HOLDOUT_FILE}: {len(comparison)} held-out listings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from prediction.service import score_apartments, score_houses
+
+PROPERTY_SCORERS = {
+    "APARTMENT": score_apartments,
+    "HOUSE": score_houses,
+}
+
+
+def score_properties(df, pipelines, observers=None, caches=None):
+    """
+    Score a batch mixing houses and apartments in one call.
+
+    `df` needs a `property_type` column (APARTMENT or HOUSE, any case) and
+    `pipelines` maps each property type to its pipeline, or None when that
+    model is not available. The batch is split with vectorized masks, each
+    partition is enriched and scored once by its own model (only the
+    apartment prices are back-transformed from the log scale), and the
+    prices come back in the original row order. `observers` optionally maps a
+    property type to the observers of its partition (the process-wide ones by
+    default) and `caches` to its prediction cache (see `score_batch`).
+
+    Returns the prices in EUR (NaN for rejected rows) and the error messages
+    indexed by row position.
+    """
+    df = df.reset_index(drop=True)
+    prices = np.full(len(df), np.nan)
+    property_type = (
+        df["property_type"].astype(str).str.strip().str.upper()
+        if "property_type" in df
+        else pd.Series("", index=df.index)
+    )
+
+    messages = []
+    routed = np.zeros(len(df), dtype=bool)
+    for kind, score in PROPERTY_SCORERS.items():
+        mask = (property_type == kind).to_numpy()
+        routed |= mask
+        if not mask.any():
+            continue
+        pipeline = pipelines.get(kind)
+        if pipeline is None:
+            messages.append(pd.Series(f"The {kind.lower()} model is not available", index=np.flatnonzero(mask)))
+            continue
+        partition_prices, partition_messages = score(
+            pipeline, df[mask], observers=(observers or {}).get(kind), cache=(caches or {}).get(kind)
+        )
+        prices[mask] = partition_prices
+        messages.append(partition_messages)
+
+    if not routed.all():
+        expected = " or ".join(PROPERTY_SCORERS)
+        messages.append(pd.Series(f"property_type must be {expected}", index=np.flatnonzero(~routed)))
+
+    messages = pd.concat(messages).sort_index() if messages else pd.Series(dtype=object)
+    return prices, messages
@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from prediction.cache import cached_predict
+from prediction.data import (
+    APARTMENT_FEATURES,
+    APARTMENT_PROVINCE_NAMES,
+    HOUSE_FEATURES,
+    apartment_categories,
+    bucket_categories,
+)
+from prediction.observers import default_observers
+from prediction.validation import (
+    APARTMENT_SCHEMA,
+    HOUSE_SCHEMA,
+    error_messages,
+    normalize_enum,
+    valid_rows,
+    validate_batch,
+)
+from prediction.zip_codes import lookup_zip_codes, provinces_from_zip_codes
+from prediction.zip_features import ZIP_FEATURE_COLUMNS, attach_zip_features
+
+# Set PREDICTION_ZIP_FEATURES=1 to add the ZIP-level features (see
+# prediction.zip_features) to every scored batch, so the audit log records
+# them. Pipelines trained with those columns get them whatever the setting.
+ATTACH_ZIP_FEATURES = os.environ.get("PREDICTION_ZIP_FEATURES", "0") == "1"
+
+# ==============================
+# 1. Feature Preparation
+# ==============================
+def _normalize(df, schema):
+    df = df.copy()
+    df["zip_code"] = df["zip_code"].astype(str).str.strip()
+    for column in schema["enums"]:
+        df[column] = normalize_enum(df[column])
+    for column in schema.get("optional", []):
+        if column not in df:
+            df[column] = np.nan
+    return df
+
+
+def prepare_apartments(df):
+    """
+    Turn validated apartment inputs into the apartment pipeline's features.
+
+    Derives `province` from the ZIP code, named as in the training listings,
+    and `fl_terrace` from `terrace_sqm` when the client did not send it.
+    Categories the model was not fit on (e.g. all but the 50 most frequent
+    ZIP codes) become "Other", as in training.
+    """
+    df = _normalize(df, APARTMENT_SCHEMA)
+    provinces = pd.Series(provinces_from_zip_codes(df["zip_code"]), index=df.index)
+    df["province"] = provinces.replace(APARTMENT_PROVINCE_NAMES)
+    if "fl_terrace" not in df:
+        df["fl_terrace"] = (df["terrace_sqm"].fillna(0) > 0).astype(int)
+    return bucket_categories(df[APARTMENT_FEATURES], apartment_categories())
+
+
+def prepare_houses(df, zip_table=None):
+    """
+    Turn validated house inputs into the house pipeline's features.
+
+    Adds `province`, `latitude` and `longitude` from the ZIP code and fills the
+    terrace and flood zone columns the house page hardcodes to 0.
+    """
+    df = _normalize(df, HOUSE_SCHEMA)
+    location = lookup_zip_codes(df["zip_code"], zip_table)
+    df["province"] = provinces_from_zip_codes(df["zip_code"])
+    df["latitude"] = location["latitude"].to_numpy()
+    df["longitude"] = location["longitude"].to_numpy()
+    for column in ["terrace_sqm", "fl_terrace", "fl_floodzone"]:
+        if column not in df:
+            df[column] = 0
+    return df[HOUSE_FEATURES]
+
+def wants_zip_features(pipeline):
+    """
+    Whether batches scored by `pipeline` get the ZIP-level feature columns.
+    """
+    names = getattr(pipeline, "feature_names_in_", None)
+    return ATTACH_ZIP_FEATURES or (names is not None and any(column in names for column in ZIP_FEATURE_COLUMNS))
+
+# ==============================
+# 2. Batch Scoring
+# ==============================
+def score_batch(pipeline, df, schema, prepare, log_target, observers=(), cache=None):
+    """
+    Validate and score a batch, returning prices in EUR and error messages.
+
+    Invalid rows are not sent to the model: their price is NaN and their
+    message is listed in the returned Series, indexed like `df`. The features
+    and prices of the scored rows are passed to the `update` method of every
+    observer (drift monitor, audit log writer), with the ZIP-level features
+    when `wants_zip_features(pipeline)`. With a `cache` (see
+    prediction.cache) only the rows it has not seen are sent to the model.
+    """
+    errors = validate_batch(df, schema)
+    valid = valid_rows(errors)
+    prices = np.full(len(df), np.nan)
+    if valid.any():
+        features = prepare(df[valid])
+        if wants_zip_features(pipeline):
+            features = attach_zip_features(features)
+        raw = cached_predict(cache, pipeline, features)
+        prices[valid] = np.expm1(raw) if log_target else raw
+        for observer in observers:
+            observer.update(features, prices[valid])
+    return prices, error_messages(errors, schema)
+
+
+def score_apartments(pipeline, df, observers=None, cache=None):
+    """
+    `score_batch` for apartments. Scored rows go to the process-wide
+    observers (see prediction.observers) unless `observers` is given.
+    """
+    if observers is None:
+        observers = default_observers("APARTMENT")
+    return score_batch(
+        pipeline, df, APARTMENT_SCHEMA, prepare_apartments, log_target=True, observers=observers, cache=cache
+    )
+
+
+def score_houses(pipeline, df, observers=None, cache=None):
+    """
+    `score_batch` for houses, with the same default observers.
+    """
+    if observers is None:
+        observers = default_observers("HOUSE")
+    return score_batch(pipeline, df, HOUSE_SCHEMA, prepare_houses, log_target=False, observers=observers, cache=cache)
@@ -0,0 +1,106 @@
+import math
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+
+from xgboost import XGBModel
+
+
+def available_cpus():
+    """
+    Number of CPUs this process may run on (respects container CPU affinity).
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ThreadingPolicy:
+    """
+    Choose XGBoost's `nthread` per prediction call.
+
+    Small batches run on one thread, because waking an OpenMP team costs more
+    than scoring a handful of rows. Larger batches get one thread per
+    `rows_per_thread` rows, capped by the CPUs left over after the other
+    in-flight calls take their share, so concurrent requests do not
+    oversubscribe the cores.
+
+    XGBoost reads `nthread` from the booster, so the policy keeps one copy of
+    the booster per model and thread count instead of mutating the shared
+    one. The copies are held by a weak reference to the model, so they go
+    away with it when a model is reloaded.
+    """
+
+    def __init__(self, max_threads=None, single_thread_rows=256, rows_per_thread=2048):
+        self.max_threads = max_threads or available_cpus()
+        self.single_thread_rows = single_thread_rows
+        self.rows_per_thread = rows_per_thread
+        self._active = 0
+        self._lock = threading.Lock()
+        self._boosters = weakref.WeakKeyDictionary()
+
+    @property
+    def active(self):
+        return self._active
+
+    def threads_for(self, batch_size, active=None):
+        """
+        Thread count for a batch of `batch_size` rows with `active` in-flight calls.
+        """
+        if batch_size <= self.single_thread_rows:
+            return 1
+        active = max(1, self._active if active is None else active)
+        share = max(1, self.max_threads // active)
+        wanted = math.ceil(batch_size / self.rows_per_thread)
+        return max(1, min(share, wanted))
+
+    @contextmanager
+    def track(self):
+        """
+        Count a prediction call as in flight for the duration of the block.
+        """
+        with self._lock:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def booster_for(self, model, nthread):
+        """
+        Copy of the fitted model's booster configured with `nthread` threads.
+        """
+        with self._lock:
+            boosters = self._boosters.setdefault(model, {})
+            booster = boosters.get(nthread)
+            if booster is None:
+                booster = model.get_booster().copy()
+                booster.set_param({"nthread": nthread})
+                boosters[nthread] = booster
+        return booster
+
+    def predict(self, pipeline, df):
+        """
+        Predict with `pipeline`, scoring its final XGBoost step on the number
+        of threads chosen for this batch. Pipelines that do not end in an
+        XGBoost model are called as-is.
+        """
+        model = pipeline[-1] if hasattr(pipeline, "steps") else pipeline
+        if not isinstance(model, XGBModel):
+            return pipeline.predict(df)
+
+        with self.track():
+            features = pipeline[:-1].transform(df) if model is not pipeline else df
+            booster = self.booster_for(model, self.threads_for(len(df)))
+            try:
+                iteration_range = (0, model.best_iteration + 1)
+            except AttributeError:
+                iteration_range = (0, 0)
+            return booster.inplace_predict(
+                features,
+                iteration_range=iteration_range,
+                missing=model.missing,
+            )
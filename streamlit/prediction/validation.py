@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from prediction.zip_codes import load_zip_table, zip_code_index
+
+# ==============================
+# 1. Input Schemas
+# ==============================
+# Options offered by the selectboxes on the prediction pages. They are labels
+# for the values the models were trained on (see `normalize_enum`).
+STATE_BUILDING_OPTIONS = ["NEW", "GOOD", "JUST RENOVATED", "TO BE DONE UP", "TO RENOVATE", "TO RESTORE"]
+HEATING_TYPE_OPTIONS = ["GAS", "ELECTRIC", "FUEL OIL", "WOOD", "SOLAR", "PELLET", "CARBON"]
+
+# Values found in the training data (apartments_sqm.csv), the only ones the
+# encoders know: any other value would be encoded like the dropped first
+# category, so it is rejected
+STATE_BUILDING_VALUES = [
+    "AS_NEW", "GOOD", "JUST_RENOVATED", "TO_BE_DONE_UP", "TO_RENOVATE", "TO_RESTORE", "MISSING",
+]
+HEATING_TYPE_VALUES = [
+    "GAS", "ELECTRIC", "FUELOIL", "SOLAR", "PELLET", "CARBON", "WOOD", "MISSING",
+]
+
+# Labels that differ from their training value by more than case and spaces
+ENUM_ALIASES = {"NEW": "AS_NEW", "FUEL_OIL": "FUELOIL"}
+
+# Numeric ranges are the min/max values of the number inputs on each page.
+# Missing values are accepted for the `optional` columns, which the pipelines impute.
+APARTMENT_SCHEMA = {
+    "zip_code": True,
+    "numeric": {
+        "total_area_sqm": (10, 500),
+        "nbr_bedrooms": (0, 10),
+        "terrace_sqm": (0, 100),
+        "construction_year": (1900, 2024),
+    },
+    "optional": ["construction_year", "terrace_sqm"],
+    "enums": {
+        "state_building": STATE_BUILDING_VALUES,
+        "heating_type": HEATING_TYPE_VALUES,
+    },
+    "flags": ["fl_furnished", "fl_double_glazing"],
+}
+
+HOUSE_SCHEMA = {
+    "zip_code": True,
+    "numeric": {
+        "total_area_sqm": (10, 1000),
+        "nbr_bedrooms": (0, 10),
+        "construction_year": (1900, 2024),
+        "garden_sqm": (0, 2000),
+    },
+    "optional": ["construction_year"],
+    "enums": {
+        "state_building": STATE_BUILDING_VALUES,
+        "heating_type": HEATING_TYPE_VALUES,
+    },
+    "flags": [],
+}
+
+# ==============================
+# 2. Column-wise Batch Validation
+# ==============================
+def normalize_enum(values):
+    """
+    Spell form labels and client values like the training data: upper-case,
+    underscores between words, and `ENUM_ALIASES` applied.
+    """
+    values = values.astype(str).str.strip().str.upper().str.replace(r"\s+", "_", regex=True)
+    return values.replace(ENUM_ALIASES)
+
+
+def validate_batch(df, schema, zip_table=None):
+    """
+    Validate a batch of properties column by column.
+
+    Returns a boolean DataFrame with one column per checked field and one row
+    per input row, True where the value is invalid. A required column missing
+    from `df` marks every row invalid for that field.
+    """
+    errors = {}
+    missing = np.ones(len(df), dtype=bool)
+    optional = set(schema.get("optional", []))
+
+    if schema.get("zip_code"):
+        if "zip_code" in df:
+            table = zip_table or load_zip_table()
+            index = zip_code_index(df["zip_code"])
+            known = index >= 0
+            known[known] = table["known"][index[known]]
+            errors["zip_code"] = ~known
+        else:
+            errors["zip_code"] = missing
+
+    for column, (low, high) in schema.get("numeric", {}).items():
+        if column not in df:
+            errors[column] = ~missing if column in optional else missing
+            continue
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+        # NaN fails both comparisons, so missing values are reported too
+        errors[column] = ~((values >= low) & (values <= high))
+        if column in optional:
+            errors[column] &= ~np.isnan(values)
+
+    for column, options in schema.get("enums", {}).items():
+        if column not in df:
+            errors[column] = missing
+            continue
+        values = normalize_enum(df[column])
+        errors[column] = ~values.isin(options).to_numpy(dtype=bool) | df[column].isna().to_numpy()
+
+    for column in schema.get("flags", []):
+        if column not in df:
+            errors[column] = missing
+            continue
+        errors[column] = ~df[column].isin([0, 1]).to_numpy(dtype=bool)
+
+    return pd.DataFrame(errors, index=df.index)
+
+
+def valid_rows(errors):
+    """
+    Boolean mask of the rows without any validation error.
+    """
+    return ~errors.to_numpy().any(axis=1)
+
+
+def error_messages(errors, schema):
+    """
+    Build one readable message per invalid row.
+
+    The messages are assembled column-wise, so the cost grows with the number
+    of checked fields rather than the number of rows.
+    """
+    descriptions = {"zip_code": "ZIP code is not a known 4-digit Belgian ZIP code"}
+    for column, (low, high) in schema.get("numeric", {}).items():
+        descriptions[column] = f"{column} must be between {low} and {high}"
+        if column in schema.get("optional", []):
+            descriptions[column] += " when given"
+    for column, options in schema.get("enums", {}).items():
+        descriptions[column] = f"{column} must be one of {', '.join(options)}"
+    for column in schema.get("flags", []):
+        descriptions[column] = f"{column} must be 0 or 1"
+
+    messages = pd.Series("", index=errors.index, dtype=object)
+    for column in errors.columns:
+        # object dtype keeps an empty batch's Series addable to `messages`
+        flagged = pd.Series(np.where(errors[column], descriptions[column] + "; ", ""), index=errors.index, dtype=object)
+        messages = messages + flagged
+    messages = messages.str.rstrip("; ")
+    return messages[~valid_rows(errors)]
@@ -0,0 +1,149 @@
+"""
+Startup warm-up for the prediction service.
+
+Loads the artifacts in Trained_Models (the models for the configured
+backend and the ZIP lookup tables) through the same cached loaders the
+service uses, then scores synthetic batches of representative sizes with
+both models, so the first real requests do not pay for unpickling, lazy
+xgboost/onnxruntime initialization and first-call pandas/sklearn paths.
+Each phase is timed. Measure a cold start from the streamlit directory with:
+
+    python -m prediction.warmup
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, HOUSE_MODEL_FILE, artifact_path
+from prediction.data import apartment_categories
+from prediction.models import load_pipeline
+from prediction.service import score_apartments, score_houses
+from prediction.validation import APARTMENT_SCHEMA, HOUSE_SCHEMA
+from prediction.zip_codes import load_zip_table
+from prediction.zip_features import ZIP_FEATURES_FILE, load_zip_features
+
+DEFAULT_BATCH_SIZES = [1, 32, 1024]
+
+# Model file, input schema and scorer per model
+WARMUP_MODELS = {
+    "apartment": (APARTMENT_MODEL_FILE, APARTMENT_SCHEMA, score_apartments),
+    "house": (HOUSE_MODEL_FILE, HOUSE_SCHEMA, score_houses),
+}
+
+
+def synthetic_batch(schema, rows, seed=0):
+    """
+    Random valid inputs for `schema`: known ZIP codes, numbers inside the
+    accepted ranges and allowed enum values.
+    """
+    rng = np.random.default_rng(seed)
+    known_zip_codes = np.flatnonzero(load_zip_table()["known"])
+    df = pd.DataFrame({"zip_code": [f"{z:04d}" for z in rng.choice(known_zip_codes, rows)]})
+    for column, (lo, hi) in schema["numeric"].items():
+        df[column] = rng.integers(lo, hi, rows, endpoint=True)
+    for column, values in schema["enums"].items():
+        df[column] = rng.choice(values, rows)
+    for column in schema["flags"]:
+        df[column] = rng.integers(0, 1, rows, endpoint=True)
+    return df
+
+
+def warm_up(get_pipeline=load_pipeline, batch_sizes=DEFAULT_BATCH_SIZES):
+    """
+    Run the warm-up phases and return their durations in seconds, keyed by
+    phase name. Models `get_pipeline` cannot find are skipped.
+    """
+    timings = {}
+
+    def timed(phase, load):
+        start = time.perf_counter()
+        result = load()
+        timings[phase] = time.perf_counter() - start
+        return result
+
+    # Lookup tables (the drift baselines are read when the API module loads)
+    timed("load zipcode-belgium.json", load_zip_table)
+    timed("load apartment categories", apartment_categories)
+    if os.path.exists(artifact_path(ZIP_FEATURES_FILE)):
+        timed(f"load {ZIP_FEATURES_FILE}", load_zip_features)
+
+    for model, (file_name, schema, score) in WARMUP_MODELS.items():
+        try:
+            pipeline = timed(f"load {model} model", lambda: get_pipeline(file_name))
+        except FileNotFoundError:
+            pipeline = None
+        if pipeline is None:
+            timings.pop(f"load {model} model", None)
+            continue
+        for rows in batch_sizes:
+            df = synthetic_batch(schema, rows)
+            # Synthetic rows must not reach the drift monitor or the audit log
+            timed(f"{model} predict x{rows}", lambda: score(pipeline, df, observers=()))
+    return timings
+
+
+class Readiness:
+    """
+    Readiness flag flipped once the warm-up has run in a background thread.
+
+    A failed warm-up leaves the instance not ready, with the exception in
+    `error`.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.timings = {}
+        self.error = None
+
+    def start(self, get_pipeline=load_pipeline, batch_sizes=DEFAULT_BATCH_SIZES):
+        thread = threading.Thread(target=self._run, args=(get_pipeline, batch_sizes), name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self, get_pipeline, batch_sizes):
+        try:
+            self.timings = warm_up(get_pipeline, batch_sizes)
+        except Exception as e:
+            self.error = e
+            return
+        self.ready = True
+
+
+def prometheus_warmup(readiness):
+    """
+    Render the readiness flag and warm-up phase durations in the Prometheus
+    text format.
+    """
+    lines = [
+        "# HELP prediction_ready Whether the warm-up has finished",
+        "# TYPE prediction_ready gauge",
+        f"prediction_ready {int(readiness.ready)}",
+        "# HELP prediction_warmup_failed Whether the warm-up raised an error",
+        "# TYPE prediction_warmup_failed gauge",
+        f"prediction_warmup_failed {int(readiness.error is not None)}",
+        "# HELP prediction_warmup_seconds Duration of each warm-up phase",
+        "# TYPE prediction_warmup_seconds gauge",
+    ]
+    for phase, seconds in readiness.timings.items():
+        lines.append(f'prediction_warmup_seconds{{phase="{phase}"}} {seconds:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the warm-up phases of a cold process.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    timings = warm_up(batch_sizes=args.batch_sizes)
+    for phase, seconds in timings.items():
+        print(f"{phase:<45}{seconds * 1000:>10.1f} ms")
+    print(f"{'total':<45}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from prediction.artifacts import artifact_path
+
+# Belgian ZIP codes are 4 digits, so every lookup table is a dense array
+# indexed directly by the ZIP code as an integer.
+ZIP_TABLE_SIZE = 10000
+
+# ==============================
+# 1. ZIP Code Reference Table
+# ==============================
+@lru_cache(maxsize=None)
+def load_zip_table(path=None):
+    """
+    Load zipcode-belgium.json into dense arrays indexed by ZIP code.
+
+    Returns a dict with a boolean `known` mask and the `city`, `lat` and `lng`
+    of every ZIP. When a ZIP is listed more than once the last entry wins,
+    like the dict the house page used to build.
+    """
+    with open(path or artifact_path("zipcode-belgium.json"), "r") as f:
+        entries = json.load(f)
+
+    codes = np.array([int(entry["zip"]) for entry in entries])
+    table = {
+        "known": np.zeros(ZIP_TABLE_SIZE, dtype=bool),
+        "city": np.full(ZIP_TABLE_SIZE, "Unknown", dtype=object),
+        "lat": np.zeros(ZIP_TABLE_SIZE),
+        "lng": np.zeros(ZIP_TABLE_SIZE),
+    }
+    table["known"][codes] = True
+    table["city"][codes] = [entry["city"] for entry in entries]
+    table["lat"][codes] = [entry["lat"] for entry in entries]
+    table["lng"][codes] = [entry["lng"] for entry in entries]
+    return table
+
+
+def zip_code_index(zip_codes):
+    """
+    Convert ZIP codes to integer table indices.
+
+    Anything that is not exactly four digits (after stripping whitespace) maps
+    to -1, so callers can mask it out before indexing a ZIP table.
+    """
+    zip_codes = pd.Series(zip_codes).astype(str).str.strip()
+    well_formed = zip_codes.str.fullmatch(r"\d{4}").to_numpy(dtype=bool)
+    index = np.full(len(zip_codes), -1, dtype=np.int64)
+    index[well_formed] = zip_codes[well_formed].astype(np.int64).to_numpy()
+    return index
+
+
+def lookup_zip_codes(zip_codes, table=None):
+    """
+    Look up city, latitude and longitude for a batch of ZIP codes.
+
+    Unknown ZIP codes get city "Unknown" and coordinates (0, 0).
+    """
+    table = table or load_zip_table()
+    index = zip_code_index(zip_codes)
+    known = index >= 0
+    known[known] = table["known"][index[known]]
+    safe_index = np.where(known, index, 0)
+    return pd.DataFrame({
+        "known": known,
+        "city": np.where(known, table["city"][safe_index], "Unknown"),
+        "latitude": np.where(known, table["lat"][safe_index], 0.0),
+        "longitude": np.where(known, table["lng"][safe_index], 0.0),
+    })
+
+# ==============================
+# 2. ZIP Code to Province Mapping
+# ==============================
+PROVINCE_RANGES = [
+    ("Brussels Capital Region", [(1000, 1299)]),
+    ("Walloon Brabant", [(1300, 1499)]),
+    ("Flemish Brabant", [(1500, 1999), (3000, 3499)]),
+    ("Antwerp", [(2000, 2999)]),
+    ("Limburg", [(3500, 3999)]),
+    ("Liège", [(4000, 4999)]),
+    ("Namur", [(5000, 5999)]),
+    ("Hainaut", [(6000, 6599), (7000, 7999)]),
+    ("Luxembourg", [(6600, 6999)]),
+    ("West Flanders", [(8000, 8999)]),
+    ("East Flanders", [(9000, 9992)]),
+]
+
+
+def provinces_from_zip_codes(zip_codes, unknown="Unknown"):
+    """
+    Map a batch of ZIP codes to their province with the same ranges the
+    prediction pages use. ZIP codes outside every range map to `unknown`.
+    """
+    index = zip_code_index(zip_codes)
+    conditions = [
+        np.logical_or.reduce([(index >= low) & (index <= high) for low, high in ranges])
+        for _, ranges in PROVINCE_RANGES
+    ]
+    names = [name for name, _ in PROVINCE_RANGES]
+    return np.select(conditions, names, default=unknown).astype(object)
@@ -0,0 +1,141 @@
+"""
+ZIP-level feature store.
+
+An offline job aggregates the listings per ZIP code into a few dense columns
+(median price per sqm, listing count, and price levels smoothed over the
+neighbouring ZIP codes) and stores them as one array indexed by ZIP code, so
+training and serving attach them with an O(1) lookup instead of one-hot
+encoding the ZIP code. Rebuild it from the streamlit directory with:
+
+    python -m prediction.zip_features
+
+The store is built from the training split only, so the held-out listings
+the model is evaluated on do not leak into their own ZIP aggregates. Pass
+`--all-rows` to build it from every listing.
+"""
+import argparse
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from prediction.artifacts import artifact_path
+from prediction.data import load_apartments, split_apartments
+from prediction.zip_codes import ZIP_TABLE_SIZE, load_zip_table, zip_code_index
+
+ZIP_FEATURES_FILE = "zip_features.npz"
+ZIP_FEATURE_COLUMNS = [
+    "zip_median_price_sqm",
+    "zip_listing_count",
+    "zip_neighbor_price_sqm",
+    "zip_smoothed_price_sqm",
+]
+
+# ==============================
+# 1. Offline Aggregation
+# ==============================
+def _distances_km(lat_a, lng_a, lat_b, lng_b):
+    """
+    Pairwise equirectangular distances, accurate enough at Belgium's scale.
+    """
+    lat_a, lat_b = np.radians(lat_a)[:, None], np.radians(lat_b)[None, :]
+    lng_a, lng_b = np.radians(lng_a)[:, None], np.radians(lng_b)[None, :]
+    x = (lng_b - lng_a) * np.cos((lat_a + lat_b) / 2)
+    y = lat_b - lat_a
+    return 6371.0 * np.sqrt(x ** 2 + y ** 2)
+
+
+def build_zip_features(df, zip_table=None, neighbors=8, prior_weight=10):
+    """
+    Aggregate listings into a (ZIP_TABLE_SIZE, len(ZIP_FEATURE_COLUMNS)) array.
+
+    `zip_neighbor_price_sqm` is the listing-weighted mean of the median price
+    per sqm of the `neighbors` nearest ZIP codes that have listings (the ZIP
+    itself excluded). `zip_smoothed_price_sqm` shrinks a ZIP's own median
+    towards that neighbour average with a weight of `prior_weight` listings,
+    so ZIP codes with few or no listings still get a sensible price level.
+
+    Pass only the training split when the features feed a model, otherwise
+    the held-out prices leak into the features.
+    """
+    table = zip_table or load_zip_table()
+    listings = df[(df["total_area_sqm"] > 0) & df["price"].notna()]
+    listings = pd.DataFrame({
+        "zip": zip_code_index(listings["zip_code"]),
+        "price_sqm": (listings["price"] / listings["total_area_sqm"]).to_numpy(),
+    })
+    listings = listings[listings["zip"] >= 0]
+    per_zip = listings.groupby("zip")["price_sqm"].agg(["median", "count"])
+
+    features = np.full((ZIP_TABLE_SIZE, len(ZIP_FEATURE_COLUMNS)), np.nan, dtype=np.float32)
+    features[:, 1] = 0
+    features[per_zip.index, 0] = per_zip["median"]
+    features[per_zip.index, 1] = per_zip["count"]
+
+    # Neighbour averages for every ZIP with coordinates, over the ZIPs with listings
+    located = np.flatnonzero(table["known"])
+    sources = per_zip.index[table["known"][per_zip.index]].to_numpy()
+    distances = _distances_km(
+        table["lat"][located], table["lng"][located],
+        table["lat"][sources], table["lng"][sources],
+    )
+    distances[located[:, None] == sources[None, :]] = np.inf
+    k = min(neighbors, len(sources) - 1)
+    nearest = np.argpartition(distances, k, axis=1)[:, :k]
+    weights = per_zip["count"].to_numpy()[np.searchsorted(per_zip.index, sources)][nearest]
+    medians = per_zip["median"].to_numpy()[np.searchsorted(per_zip.index, sources)][nearest]
+    features[located, 2] = (weights * medians).sum(axis=1) / weights.sum(axis=1)
+
+    counts = features[:, 1]
+    own = np.nan_to_num(features[:, 0])
+    features[:, 3] = (counts * own + prior_weight * features[:, 2]) / (counts + prior_weight)
+    return features
+
+
+def save_zip_features(features, path=None):
+    np.savez_compressed(path or artifact_path(ZIP_FEATURES_FILE), features=features, columns=ZIP_FEATURE_COLUMNS)
+
+# ==============================
+# 2. Serving-time Lookup
+# ==============================
+@lru_cache(maxsize=None)
+def load_zip_features(path=None):
+    with np.load(path or artifact_path(ZIP_FEATURES_FILE)) as store:
+        return store["features"]
+
+
+def attach_zip_features(df, features=None):
+    """
+    Return a copy of `df` with the ZIP feature columns added.
+
+    Malformed ZIP codes get NaN features, like a ZIP without coordinates.
+    """
+    features = load_zip_features() if features is None else features
+    index = zip_code_index(df["zip_code"])
+    values = features[np.where(index >= 0, index, 0)]
+    values[index < 0] = np.nan
+    df = df.copy()
+    for i, column in enumerate(ZIP_FEATURE_COLUMNS):
+        df[column] = values[:, i]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the ZIP-level feature store.")
+    parser.add_argument("--neighbors", type=int, default=8)
+    parser.add_argument("--prior-weight", type=float, default=10)
+    parser.add_argument("--output", default=artifact_path(ZIP_FEATURES_FILE))
+    parser.add_argument("--all-rows", action="store_true", help="Aggregate every listing, held-out split included.")
+    args = parser.parse_args()
+
+    df = load_apartments()
+    if not args.all_rows:
+        df, _ = split_apartments(df)
+    features = build_zip_features(df, neighbors=args.neighbors, prior_weight=args.prior_weight)
+    save_zip_features(features, args.output)
+    covered = np.count_nonzero(~np.isnan(features[:, 3]))
+    print(f"Wrote {args.output}: {covered} ZIP codes with features, {int(features[:, 1].sum())} listings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same layout the pages and the API rely on: the shared `prediction` package
+# lives in streamlit/, the FastAPI app in api/
+sys.path.insert(0, os.path.join(ROOT, "streamlit"))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+# Scoring through the service writes to the process-wide audit log; keep the
+# tests' records out of the repository's audit_logs/
+os.environ["AUDIT_LOG_DIR"] = tempfile.mkdtemp(prefix="audit_logs-")
+
+
+@pytest.fixture
+def apartment():
+    """
+    One valid apartment, as the prediction form sends it.
+    """
+    return {
+        "zip_code": "1000",
+        "total_area_sqm": 75,
+        "nbr_bedrooms": 2,
+        "terrace_sqm": 0,
+        "construction_year": 2000,
+        "state_building": "GOOD",
+        "heating_type": "GAS",
+        "fl_furnished": 0,
+        "fl_double_glazing": 1,
+    }
+
+
+@pytest.fixture
+def apartments(apartment):
+    return pd.DataFrame([apartment, {**apartment, "zip_code": "2000", "total_area_sqm": 120}])
+
+
+@pytest.fixture(scope="session")
+def apartment_pipeline():
+    from prediction.artifacts import APARTMENT_MODEL_FILE
+    from prediction.models import load_pipeline
+
+    return load_pipeline(APARTMENT_MODEL_FILE, backend="joblib")
+
+
+@pytest.fixture(scope="session")
+def api_client():
+    """
+    TestClient for api/app.py. The app reads its settings when it is
+    imported.
+    """
+    from fastapi.testclient import TestClient
+
+    import app
+
+    with TestClient(app.app) as client:
+        yield client
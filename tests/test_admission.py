@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from prediction.admission import AdmissionController, Rejected, TokenBucket, prometheus_metrics
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2, burst=2)
+    now = bucket.updated
+    assert bucket.take(now) and bucket.take(now)
+    assert not bucket.take(now)
+    assert bucket.seconds_until_token() == pytest.approx(0.5)
+    assert bucket.take(now + 0.5)
+    # Idle time never fills the bucket past its burst
+    bucket.take(now + 100)
+    assert bucket.tokens == 1
+
+
+def test_clients_over_their_rate_get_429():
+    async def run():
+        controller = AdmissionController(rate=0.001, burst=1)
+        async with controller.admit("a"):
+            pass
+        with pytest.raises(Rejected) as rejected:
+            async with controller.admit("a"):
+                pass
+        # Other clients have their own bucket
+        async with controller.admit("b"):
+            pass
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(run())
+    assert rejected.status_code == 429
+    assert controller.counters["rate_limited"] == 1
+    assert controller.counters["admitted"] == 2
+
+
+def test_full_queue_is_shed_with_503():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=0, latency_budget=10)
+        async with controller.admit("a"):
+            with pytest.raises(Rejected) as rejected:
+                async with controller.admit("b"):
+                    pass
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(run())
+    assert rejected.status_code == 503
+    assert controller.counters["shed_queue_full"] == 1
+
+
+def test_requests_that_cannot_meet_their_budget_are_shed_early():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=10, latency_budget=10, initial_service_time=1.0)
+        async with controller.admit("a"):
+            with pytest.raises(Rejected):
+                async with controller.admit("b", budget=0.5):
+                    pass
+        return controller
+
+    controller = asyncio.run(run())
+    assert controller.counters["shed_deadline"] == 1
+    assert controller.in_flight == 0 and controller.queued == 0
+
+
+def test_prometheus_metrics_lists_every_controller():
+    text = prometheus_metrics({"apartment": AdmissionController(), "house": AdmissionController()})
+    assert 'prediction_admitted_total{model="apartment"} 0' in text
+    assert 'prediction_queue_depth{model="house"} 0' in text
+
+
+@pytest.mark.parametrize("budget", ["abc", "nan", "-5", "0", "inf"])
+def test_invalid_latency_budget_header_is_a_400(api_client, apartment, budget):
+    response = api_client.post(
+        "/predict/apartment", json={"data": [apartment]}, headers={"X-Latency-Budget-Ms": budget}
+    )
+    assert response.status_code == 400
+    assert "X-Latency-Budget-Ms" in response.json()["detail"]
+
+
+def test_valid_latency_budget_header_is_accepted(api_client, apartment):
+    response = api_client.post(
+        "/predict/apartment", json={"data": [apartment]}, headers={"X-Latency-Budget-Ms": "5000"}
+    )
+    assert response.status_code == 200
+
+
+def test_a_free_slot_is_taken_even_without_slack():
+    async def run():
+        controller = AdmissionController(latency_budget=1.0, initial_service_time=1.0)
+        async with controller.admit("a"):
+            pass
+        return controller
+
+    assert asyncio.run(run()).counters["admitted"] == 1
+
+
+def test_new_clients_get_their_full_burst():
+    async def run():
+        controller = AdmissionController(rate=0.001, burst=1)
+        async with controller.admit("a"):
+            pass
+        return controller
+
+    assert asyncio.run(run()).counters["rate_limited"] == 0
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+from fastapi import Request
+
+from prediction.admission import AdmissionController
+from prediction.artifacts import HOUSE_MODEL_FILE, artifact_path
+
+HOUSE_MODEL_MISSING = not os.path.exists(artifact_path(HOUSE_MODEL_FILE))
+
+
+def test_alive(api_client):
+    assert api_client.get("/").json() == "alive"
+
+
+def test_predict_apartments(api_client, apartment):
+    response = api_client.post("/predict/apartment", json={"data": [apartment, {**apartment, "zip_code": "0042"}]})
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"predictions", "errors"}
+    assert body["predictions"][0] > 0
+    assert body["predictions"][1] is None
+    assert body["errors"][0]["row"] == 1
+
+
+def test_empty_data_is_rejected(api_client):
+    assert api_client.post("/predict/apartment", json={"data": []}).status_code == 422
+
+
+def test_malformed_body_is_a_422(api_client):
+    response = api_client.post("/predict/apartment", content=b'{"data": {}}', headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["data"]
+    assert api_client.post("/predict/apartment", content=b"not json").status_code == 422
+
+
+def test_rejected_requests_are_not_read(api_client, apartment, monkeypatch):
+    import app
+
+    reads = []
+    original_body = Request.body
+
+    async def counting_body(self):
+        reads.append(self.url.path)
+        return await original_body(self)
+
+    monkeypatch.setattr(Request, "body", counting_body)
+    monkeypatch.setitem(app.admission, "apartment", AdmissionController(rate=0.001, burst=0))
+    assert api_client.post("/predict/apartment", json={"data": [apartment]}).status_code == 429
+    assert reads == []
+
+
+def test_mixed_batch_routes_on_property_type(api_client, apartment):
+    rows = [{**apartment, "property_type": "apartment"}, {**apartment, "property_type": "castle"}]
+    body = api_client.post("/predict", json={"data": rows}).json()
+    assert body["predictions"][0] > 0
+    assert body["errors"] == [{"row": 1, "message": "property_type must be APARTMENT or HOUSE"}]
+
+
+@pytest.mark.skipif(not HOUSE_MODEL_MISSING, reason="the house model is present")
+def test_missing_model_returns_503(api_client, apartment):
+    response = api_client.post("/predict/house", json={"data": [apartment]})
+    assert response.status_code == 503
+    assert "not available" in response.json()["detail"]
+
+
+def test_metrics_are_exported(api_client):
+    text = api_client.get("/metrics").text
+    assert "prediction_audit_written_rows_total" in text
+    assert "prediction_ready" in text
@@ -0,0 +1,147 @@
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from prediction.audit import IN_PROGRESS_SUFFIX, AuditLog, open_audit_log, prometheus_audit, read_audit_log
+from prediction.service import prepare_apartments, score_apartments
+
+
+def today():
+    return datetime.now(timezone.utc).date()
+
+
+def audit_files(directory, model="apartment"):
+    day_dir = os.path.join(directory, model, today().strftime("%Y-%m-%d"))
+    return sorted(os.listdir(day_dir)) if os.path.isdir(day_dir) else []
+
+
+def wait_for_written(log, rows, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while log.metrics()["written_rows"] < rows and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def logged_rows(log):
+    # Rows move from buffered to written under one lock, so the sum is stable
+    metrics = log.metrics()
+    return metrics["buffered_rows"] + metrics["written_rows"]
+
+
+def test_batches_are_written_and_read_back(tmp_path, apartments):
+    log = AuditLog(directory=str(tmp_path), flush_interval=0.01).start()
+    writer = log.writer("apartment", "model.joblib@abc")
+    features = prepare_apartments(apartments)
+    writer.update(features, np.array([250_000.0, 350_000.0]))
+    writer.update(features.head(1), np.array([260_000.0]))
+    log.close()
+
+    records = read_audit_log(today(), "apartment", directory=str(tmp_path))
+    assert records["price"].tolist() == [250_000.0, 350_000.0, 260_000.0]
+    assert records["row"].tolist() == [0, 1, 0]
+    assert set(records["model_version"]) == {"model.joblib@abc"}
+    assert records["zip_code"].tolist() == ["1000", "2000", "1000"]
+    assert records["request_id"].nunique() == 2
+    assert log.metrics() == {"buffered_rows": 0, "written_rows": 3, "dropped_rows": 0, "failed_rows": 0}
+    assert not any(name.endswith(IN_PROGRESS_SUFFIX) for name in audit_files(str(tmp_path)))
+
+
+def test_files_rotate_by_rows(tmp_path, apartments):
+    log = AuditLog(directory=str(tmp_path), flush_interval=0.01, rotate_rows=1).start()
+    writer = log.writer("apartment", "v1")
+    features = prepare_apartments(apartments)
+    for rows, price in enumerate([250_000.0, 350_000.0], start=1):
+        writer.update(features.head(1), np.array([price]))
+        # Let the writer thread flush each batch on its own
+        wait_for_written(log, rows)
+    log.close()
+    assert len(audit_files(str(tmp_path))) == 2
+    assert len(read_audit_log(today().strftime("%Y-%m-%d"), "apartment", directory=str(tmp_path))) == 2
+
+
+def test_logs_sharing_a_directory_write_distinct_files(tmp_path, apartments):
+    # Two workers starting in the same second both use sequence number 1
+    features = prepare_apartments(apartments)
+    logs = [AuditLog(directory=str(tmp_path), flush_interval=0.01).start() for _ in range(2)]
+    for log in logs:
+        log.writer("apartment", "v1").update(features, np.array([1.0, 2.0]))
+    for log in logs:
+        log.close()
+    assert len(audit_files(str(tmp_path))) == 2
+    assert len(read_audit_log(today(), "apartment", directory=str(tmp_path))) == 4
+
+
+def test_full_buffer_drops_and_reports_rows(tmp_path, apartments, caplog):
+    # Not started, so nothing leaves the buffer
+    log = AuditLog(directory=str(tmp_path), max_buffered_rows=2)
+    features = prepare_apartments(apartments)
+    assert log.record("apartment", "v1", features, np.array([1.0, 2.0]))
+    with caplog.at_level(logging.WARNING, logger="prediction.audit"):
+        assert not log.record("apartment", "v1", features, np.array([1.0, 2.0]))
+        assert not log.record("apartment", "v1", features.head(1), np.array([1.0]))
+
+    assert log.metrics()["dropped_rows"] == 3
+    assert "prediction_audit_dropped_rows_total 3" in prometheus_audit(log)
+    # One warning per interval, not one per dropped batch
+    warnings = [r for r in caplog.records if r.name == "prediction.audit"]
+    assert len(warnings) == 1
+    assert "dropped 2 rows" in warnings[0].getMessage()
+
+
+def test_a_bad_batch_does_not_lose_the_others(tmp_path, apartments, caplog):
+    log = AuditLog(directory=str(tmp_path), flush_interval=0.01)
+    features = prepare_apartments(apartments)
+    log.record("apartment", "v1", features, np.array([1.0, 2.0]))
+    # One price for two feature rows cannot be converted
+    log.record("apartment", "v1", features, np.array([3.0]))
+    log.record("apartment", "v1", features.head(1), np.array([4.0]))
+    # Started after queueing, so the three batches are written in one go
+    with caplog.at_level(logging.ERROR, logger="prediction.audit"):
+        log.start().close()
+
+    assert read_audit_log(today(), "apartment", directory=str(tmp_path))["price"].tolist() == [1.0, 2.0, 4.0]
+    assert log.metrics() == {"buffered_rows": 0, "written_rows": 3, "dropped_rows": 0, "failed_rows": 1}
+    assert "Could not convert 1 audit rows of apartment" in caplog.text
+
+
+def test_writer_survives_a_failed_rotation(tmp_path, apartments, monkeypatch, caplog):
+    log = AuditLog(directory=str(tmp_path), flush_interval=0.01, rotate_rows=1)
+    close = log._close
+    failures = []
+
+    def failing_close(model):
+        if not failures:
+            failures.append(model)
+            raise OSError("disk full")
+        close(model)
+
+    monkeypatch.setattr(log, "_close", failing_close)
+    writer = log.start().writer("apartment", "v1")
+    features = prepare_apartments(apartments)
+    with caplog.at_level(logging.ERROR, logger="prediction.audit"):
+        for rows in [1, 2]:
+            writer.update(features.head(1), np.array([float(rows)]))
+            wait_for_written(log, rows)
+        log.close()
+
+    assert failures == ["apartment"]
+    assert log.metrics()["written_rows"] == 2
+    assert "Could not close the audit file" in caplog.text
+
+
+def test_missing_day_reads_as_an_empty_frame(tmp_path):
+    records = read_audit_log("2000-01-01", "apartment", directory=str(tmp_path))
+    assert records.empty
+    assert list(records.columns) == ["timestamp", "request_id", "row", "model", "model_version", "price"]
+
+
+def test_service_scoring_reaches_the_shared_audit_log(apartment_pipeline, apartments):
+    log = open_audit_log()
+    rows = logged_rows(log)
+    score_apartments(apartment_pipeline, apartments)
+    assert logged_rows(log) == rows + 2
+    # Offline jobs opt out
+    score_apartments(apartment_pipeline, apartments, observers=())
+    assert logged_rows(log) == rows + 2
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from starlette.requests import Request
+
+from prediction.admission import AdmissionController
+from prediction.bulk import ARROW_STREAM, PARQUET, bulk_format, predictions_table, read_table, table_to_frame, write_table
+
+
+def upload(api_client, table, fmt, accept=None):
+    headers = {"Content-Type": fmt}
+    if accept:
+        headers["Accept"] = accept
+    return api_client.post("/predict/apartment/bulk", content=write_table(table, fmt), headers=headers)
+
+
+def test_bulk_format_from_headers():
+    assert bulk_format("application/vnd.apache.arrow.stream; charset=binary") == ARROW_STREAM
+    assert bulk_format("application/x-parquet") == PARQUET
+    assert bulk_format("application/json") is None
+    assert bulk_format(None) is None
+
+
+@pytest.mark.parametrize("fmt", [ARROW_STREAM, PARQUET])
+def test_tables_round_trip(fmt):
+    table = pa.table({"id": ["a", "b"], "zip_code": ["1000", "2000"]})
+    assert read_table(write_table(table, fmt), fmt).equals(table)
+
+
+def test_table_to_frame_numbers_rows_without_ids():
+    ids, df = table_to_frame(pa.table({"zip_code": ["1000", "2000"]}))
+    assert ids.to_pylist() == [0, 1]
+    assert list(df.columns) == ["zip_code"]
+
+
+def test_predictions_table_masks_rejected_rows():
+    table = predictions_table(pa.array(["a", "b"]), np.array([1.0, np.nan]), pd.Series(["bad ZIP"], index=[1]))
+    assert table.to_pydict() == {"id": ["a", "b"], "price": [1.0, None], "error": [None, "bad ZIP"]}
+
+
+@pytest.mark.parametrize("fmt", [ARROW_STREAM, PARQUET])
+def test_bulk_route_scores_the_uploaded_rows(api_client, apartment, fmt):
+    rows = pd.DataFrame([apartment, {**apartment, "zip_code": "0042"}]).assign(id=["x", "y"])
+    response = upload(api_client, pa.Table.from_pandas(rows, preserve_index=False), fmt, accept=ARROW_STREAM)
+    assert response.status_code == 200
+    result = read_table(response.content, ARROW_STREAM).to_pydict()
+    assert result["id"] == ["x", "y"]
+    assert result["price"][0] > 0 and result["price"][1] is None
+    assert result["error"][0] is None and result["error"][1].startswith("ZIP code")
+
+
+def test_empty_upload_returns_an_empty_table(api_client, apartment):
+    schema = pa.Table.from_pandas(pd.DataFrame([apartment]), preserve_index=False).schema
+    response = upload(api_client, schema.empty_table(), ARROW_STREAM)
+    assert response.status_code == 200
+    assert read_table(response.content, ARROW_STREAM).num_rows == 0
+
+
+def test_unsupported_format_is_a_415(api_client):
+    response = api_client.post("/predict/apartment/bulk", content=b"{}", headers={"Content-Type": "application/json"})
+    assert response.status_code == 415
+
+
+def test_unreadable_upload_is_a_400(api_client):
+    response = api_client.post("/predict/apartment/bulk", content=b"not arrow", headers={"Content-Type": ARROW_STREAM})
+    assert response.status_code == 400
+
+
+def test_rejected_uploads_are_not_read(api_client, apartment, monkeypatch):
+    import app
+
+    reads = []
+    original_body = Request.body
+
+    async def counting_body(self):
+        reads.append(self.url.path)
+        return await original_body(self)
+
+    monkeypatch.setattr(Request, "body", counting_body)
+    monkeypatch.setitem(app.admission, "apartment_bulk", AdmissionController(rate=0.001, burst=0))
+    table = pa.Table.from_pandas(pd.DataFrame([apartment]), preserve_index=False)
+    response = upload(api_client, table, ARROW_STREAM)
+    assert response.status_code == 429
+    assert reads == []
@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction.cache import MemoryCache, PredictionCache, cached_predict, feature_keys, prometheus_cache
+from prediction.models import predict
+from prediction.service import prepare_apartments
+
+
+class CountingModel:
+    """
+    Stand-in pipeline returning the area, counting the rows it scores.
+    """
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict(self, df):
+        self.rows += len(df)
+        return df["total_area_sqm"].to_numpy(dtype=float)
+
+
+@pytest.fixture
+def features(apartments):
+    return prepare_apartments(apartments)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PredictionCache(str(tmp_path / "predictions.sqlite"))
+
+
+def test_keys_ignore_column_order_and_number_types(features):
+    keys = feature_keys(features)
+    assert len(keys) == 2 and len(set(keys)) == 2
+    assert all(len(key) == 16 for key in keys)
+    assert feature_keys(features[features.columns[::-1]]) == keys
+    assert feature_keys(features.astype({"total_area_sqm": float, "nbr_bedrooms": float})) == keys
+
+
+def test_keys_tell_apart_columns_and_missing_values(features):
+    keys = feature_keys(features)
+    assert feature_keys(features.assign(terrace_sqm=np.nan)) != keys
+    assert feature_keys(features.assign(heating_type=None)) != keys
+    assert feature_keys(features.rename(columns={"terrace_sqm": "garden_sqm"})) != keys
+
+
+def test_values_are_stored_per_model_version(cache):
+    keys = [b"a" * 16, b"b" * 16]
+    assert np.isnan(cache.get_many("v1", keys)).all()
+    cache.put_many("v1", keys, [1.5, 2.5])
+
+    np.testing.assert_array_equal(cache.get_many("v1", keys + [keys[0]]), [1.5, 2.5, 1.5])
+    assert np.isnan(cache.get_many("v2", keys)).all()
+    assert cache.metrics() == {"hits": 3, "misses": 4, "evicted": 0, "errors": 0}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = PredictionCache(str(tmp_path / "predictions.sqlite"), max_bytes=64 * 1024, touch_interval=0)
+    first = [bytes([0, i]) * 8 for i in range(100)]
+    cache.put_many("v1", first, np.arange(100))
+    # Keep the first batch in use while later ones fill the file
+    for batch in range(1, 30):
+        cache.get_many("v1", first)
+        cache.put_many("v1", [bytes([batch, i]) * 8 for i in range(100)], np.arange(100))
+
+    assert cache.metrics()["evicted"] > 0
+    assert cache.size_bytes() <= 64 * 1024
+    assert not np.isnan(cache.get_many("v1", first)).any()
+    assert np.isnan(cache.get_many("v1", [bytes([1, i]) * 8 for i in range(100)])).all()
+
+
+def test_unusable_file_counts_errors_and_falls_back_to_the_model(tmp_path, features):
+    # A directory cannot be opened as a database
+    os.mkdir(tmp_path / "predictions.sqlite")
+    cache = PredictionCache(str(tmp_path / "predictions.sqlite"))
+    model = CountingModel()
+
+    raw = cached_predict(cache.for_model("v1"), model, features)
+    np.testing.assert_array_equal(raw, [75, 120])
+    assert model.rows == 2
+    assert cache.metrics()["errors"] == 2
+    assert "prediction_cache_errors_total 2" in prometheus_cache(cache)
+
+
+def test_only_unseen_rows_reach_the_model(cache, features):
+    model = CountingModel()
+    model_cache = cache.for_model("v1")
+    cached_predict(model_cache, model, features.head(1))
+    raw = cached_predict(model_cache, model, features)
+
+    np.testing.assert_array_equal(raw, [75, 120])
+    assert model.rows == 2
+    # A sibling worker reads the same file
+    other = PredictionCache(cache.path).for_model("v1")
+    np.testing.assert_array_equal(cached_predict(other, model, features), [75, 120])
+    assert model.rows == 2
+
+
+def test_cached_predictions_match_the_model(cache, apartment_pipeline, features):
+    expected = predict(apartment_pipeline, features)
+    model_cache = cache.for_model("v1")
+    for _ in range(2):
+        np.testing.assert_allclose(cached_predict(model_cache, apartment_pipeline, features), expected, rtol=1e-6)
+    assert cache.metrics()["hits"] == 2
+
+
+def test_memory_cache_in_front_of_the_file(cache, features):
+    model = CountingModel()
+    memory = MemoryCache(max_entries=1, backend=cache.for_model("v1"))
+
+    np.testing.assert_array_equal(memory.predict(model, features), [75, 120])
+    np.testing.assert_array_equal(memory.predict(model, features.tail(1)), [120])
+    assert model.rows == 2
+    # The first row fell out of memory but is still on disk
+    np.testing.assert_array_equal(memory.predict(model, features.head(1)), [75])
+    assert model.rows == 2
+    assert cache.metrics()["hits"] == 1
+
+
+def test_memory_cache_without_a_backend(features):
+    model = CountingModel()
+    memory = MemoryCache()
+    for _ in range(3):
+        np.testing.assert_array_equal(memory.predict(model, features), [75, 120])
+    assert model.rows == 2
+    # Nothing cached is recomputed for a different batch
+    np.testing.assert_array_equal(memory.predict(model, pd.concat([features, features])), [75, 120, 75, 120])
+    assert model.rows == 2
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import MinMaxScaler
+
+from prediction.artifacts import APARTMENT_MODEL_FILE
+from prediction.compact import (
+    EQUIVALENCE_TOLERANCE,
+    check_equivalence,
+    compact_encoder,
+    compact_file_name,
+    compact_pipeline,
+    prune_booster,
+)
+from prediction.data import APARTMENT_FEATURES, load_apartments
+from prediction.models import load_pipeline
+from prediction.service import prepare_apartments
+from prediction.validation import APARTMENT_SCHEMA
+from prediction.warmup import synthetic_batch
+
+
+@pytest.fixture(scope="module")
+def compact(apartment_pipeline):
+    return compact_pipeline(apartment_pipeline)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    # Training rows (missing values included) and served rows, with the ZIP
+    # codes the encoder never saw bucketed as "Other"
+    training = load_apartments()[APARTMENT_FEATURES].sample(1000, random_state=0)
+    served = prepare_apartments(synthetic_batch(APARTMENT_SCHEMA, 500))
+    return training, served
+
+
+def test_pruned_booster_reads_only_the_split_features(apartment_pipeline):
+    model = apartment_pipeline[-1]
+    pruned, outputs = prune_booster(model)
+    n_features = model.get_booster().num_features()
+
+    assert len(outputs) == n_features
+    used = np.flatnonzero(outputs >= 0)
+    assert 0 < len(used) < n_features
+    # Kept features are renumbered in their original order
+    assert outputs[used].tolist() == list(range(len(used)))
+    assert pruned.get_booster().num_features() == len(used)
+
+
+def test_pruned_booster_predicts_the_same_on_the_narrow_matrix(apartment_pipeline, reference):
+    model = apartment_pipeline[-1]
+    pruned, outputs = prune_booster(model)
+    wide = apartment_pipeline[0].transform(reference[0]).tocsr()
+    narrow = wide[:, np.flatnonzero(outputs >= 0)]
+
+    expected = model.get_booster().predict(xgb.DMatrix(wide))
+    np.testing.assert_allclose(pruned.get_booster().predict(xgb.DMatrix(narrow)), expected, atol=EQUIVALENCE_TOLERANCE)
+
+
+def test_encoder_writes_the_kept_columns(apartment_pipeline, compact, reference):
+    _, outputs = prune_booster(apartment_pipeline[-1])
+    for df in reference:
+        wide = apartment_pipeline[0].transform(df).toarray()
+        encoded = compact[0].transform(df)
+        assert encoded.dtype == np.float32
+        np.testing.assert_allclose(
+            encoded.toarray(), wide[:, np.flatnonzero(outputs >= 0)].astype(np.float32), rtol=1e-6, atol=1e-6
+        )
+
+
+@pytest.mark.parametrize("part", [0, 1])
+def test_compact_pipeline_is_equivalent(apartment_pipeline, compact, reference, part):
+    assert check_equivalence(apartment_pipeline, compact, reference[part]) <= EQUIVALENCE_TOLERANCE
+
+
+def test_unknown_categories_and_missing_values(apartment_pipeline, compact, reference):
+    df = reference[1].head(4).copy()
+    df["zip_code"] = "9999"
+    df.loc[df.index[0], "heating_type"] = np.nan
+    df.loc[df.index[1], "construction_year"] = np.nan
+    np.testing.assert_allclose(compact.predict(df), apartment_pipeline.predict(df), atol=EQUIVALENCE_TOLERANCE)
+
+
+def test_unsupported_steps_are_refused(apartment_pipeline):
+    numeric = apartment_pipeline[0].transformers_[0]
+    preprocessor = ColumnTransformer([(numeric[0], MinMaxScaler(), numeric[2])])
+    preprocessor.fit(load_apartments()[numeric[2]].fillna(0))
+    with pytest.raises(ValueError, match="MinMaxScaler"):
+        compact_encoder(preprocessor, np.arange(len(numeric[2])))
+
+
+def test_shipped_compact_artifact_is_equivalent(apartment_pipeline, reference):
+    try:
+        shipped = load_pipeline(APARTMENT_MODEL_FILE, backend="compact")
+    except FileNotFoundError:
+        pytest.skip(f"{compact_file_name(APARTMENT_MODEL_FILE)} has not been built")
+    for df in reference:
+        assert check_equivalence(apartment_pipeline, shipped, df) <= EQUIVALENCE_TOLERANCE
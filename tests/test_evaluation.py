@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction import evaluation
+from prediction.artifacts import APARTMENT_MODEL_FILE
+from prediction.data import APARTMENT_CAT_FEATURES, APARTMENT_FEATURES, bucket_categories, load_apartments, top_categories
+from prediction.evaluation import (
+    evaluation_report,
+    load_metrics,
+    metrics_file_name,
+    regression_metrics,
+    save_metrics,
+)
+from prediction.models import model_version
+
+
+def test_rare_categories_are_bucketed_with_the_training_part_only():
+    train = pd.DataFrame({"zip_code": ["1000", "1000", "2000", "3000", None]})
+    test = pd.DataFrame({"zip_code": ["1000", "3000", "9000", None]})
+    categories = top_categories(train, ["zip_code"], top=2)
+    bucketed_train, bucketed_test = bucket_categories(train, categories), bucket_categories(test, categories)
+    # "3000" is among the test values but not among the 2 most frequent training ones
+    assert bucketed_train["zip_code"].tolist() == ["1000", "1000", "2000", "Other", "Other"]
+    assert bucketed_test["zip_code"].tolist() == ["1000", "Other", "Other", "Other"]
+    # The input frames are left as they were
+    assert train["zip_code"].iloc[3] == "3000"
+
+
+def test_regression_metrics():
+    metrics = regression_metrics(np.array([100.0, 200.0]), np.array([110.0, 180.0]))
+    assert metrics["rows"] == 2
+    assert metrics["mae"] == pytest.approx(15)
+    assert metrics["mape"] == pytest.approx(10)
+
+
+def test_report_of_a_small_cross_validation(apartment_pipeline):
+    df = load_apartments().sample(600, random_state=0)
+    report = evaluation_report(
+        apartment_pipeline, df[APARTMENT_FEATURES], df["price"], df["province"],
+        log_target=True, folds=2, max_workers=1, categorical=APARTMENT_CAT_FEATURES,
+    )
+    assert report["overall"]["rows"] == 600
+    assert len(report["per_fold"]) == 2
+    assert sum(group["rows"] for group in report["by_province"].values()) == 600
+    assert list(report["by_price_band"]) == [band for band in evaluation.PRICE_BAND_LABELS if band in report["by_price_band"]]
+    assert 0 < report["overall"]["mape"] < 100
+
+
+@pytest.fixture
+def artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(evaluation, "artifact_path", lambda file_name: str(tmp_path / file_name))
+    return tmp_path
+
+
+def test_metrics_of_the_loaded_artifact_are_returned(artifact_dir):
+    save_metrics(APARTMENT_MODEL_FILE, {"folds": 5}, model_version(APARTMENT_MODEL_FILE, "joblib"))
+    assert load_metrics(APARTMENT_MODEL_FILE)["folds"] == 5
+
+
+def test_metrics_of_another_model_version_are_dropped(artifact_dir):
+    save_metrics(APARTMENT_MODEL_FILE, {"folds": 5}, "apartments_xgb_model_log.joblib@000000000000")
+    assert load_metrics(APARTMENT_MODEL_FILE) is None
+    # Files written before the version was recorded are dropped too
+    with open(artifact_dir / metrics_file_name(APARTMENT_MODEL_FILE), "w") as f:
+        json.dump({"folds": 5}, f)
+    assert load_metrics(APARTMENT_MODEL_FILE) is None
+
+
+def test_missing_metrics(artifact_dir):
+    assert load_metrics(APARTMENT_MODEL_FILE) is None
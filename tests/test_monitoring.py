@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction.monitoring import (
+    PSI_DRIFT,
+    CategoricalSketch,
+    DriftMonitor,
+    NumericSketch,
+    build_baseline,
+    drift_monitors,
+    psi,
+)
+from prediction.service import prepare_apartments, score_apartments
+
+
+def test_numeric_sketch_keeps_a_bin_for_missing_values():
+    sketch = NumericSketch([10, 20])
+    sketch.update([5, 10, 15, 25, np.nan])
+    assert sketch.counts.tolist() == [1, 2, 1, 1]
+
+
+def test_categorical_sketch_counts_unknown_values_in_the_last_slot():
+    sketch = CategoricalSketch(["GAS", "FUEL"])
+    sketch.update(["GAS", "GAS", "ELECTRIC"])
+    assert sketch.counts.tolist() == [2, 0, 1]
+    sketch.update(np.array(["FUEL"] * 300, dtype=object))
+    assert sketch.counts.tolist() == [2, 300, 1]
+
+
+def test_psi_is_zero_for_the_same_distribution_and_large_for_a_shift():
+    assert psi([0.25, 0.25, 0.5], [25, 25, 50]) == pytest.approx(0)
+    assert psi([0.5, 0.5, 0], [0, 10, 90]) > PSI_DRIFT
+
+
+@pytest.fixture
+def baseline(apartments):
+    features = prepare_apartments(pd.concat([apartments] * 50, ignore_index=True))
+    return build_baseline(features, np.linspace(200_000, 400_000, len(features)))
+
+
+def test_monitor_waits_for_min_rows(baseline, apartments):
+    monitor = DriftMonitor(baseline)
+    monitor.update(prepare_apartments(apartments), np.array([250_000, 350_000]))
+    result = monitor.scores(min_rows=100)
+    assert result["rows"] == 2
+    assert {score["status"] for score in result["features"].values()} == {"insufficient data"}
+
+
+def test_monitor_flags_a_shifted_input(baseline, apartments):
+    monitor = DriftMonitor(baseline)
+    shifted = pd.concat([apartments.assign(heating_type="ELECTRIC", total_area_sqm=400)] * 100, ignore_index=True)
+    monitor.update(prepare_apartments(shifted), np.full(len(shifted), 300_000))
+    features = monitor.scores(min_rows=100)["features"]
+    assert features["heating_type"]["status"] == "drift"
+    assert features["total_area_sqm"]["status"] == "drift"
+
+    monitor.reset()
+    assert monitor.scores()["rows"] == 0
+
+
+def test_score_apartments_feeds_the_shared_monitor(apartment_pipeline, apartments):
+    monitor = drift_monitors()["APARTMENT"]
+    if monitor is None:
+        pytest.skip("The apartment drift baseline has not been built")
+    rows = monitor.scores()["rows"]
+
+    score_apartments(apartment_pipeline, apartments)
+    assert monitor.scores()["rows"] == rows + 2
+    # Offline jobs opt out
+    score_apartments(apartment_pipeline, apartments, observers=())
+    assert monitor.scores()["rows"] == rows + 2
+
+
+def test_apartment_page_feeds_the_shared_monitor(apartment_pipeline):
+    from streamlit.testing.v1 import AppTest
+
+    from conftest import ROOT
+
+    monitor = drift_monitors()["APARTMENT"]
+    if monitor is None:
+        pytest.skip("The apartment drift baseline has not been built")
+    rows = monitor.scores()["rows"]
+
+    at = AppTest.from_file(f"{ROOT}/streamlit/Pages/appartment_prediction.py", default_timeout=60).run()
+    # The second submission is served from the page's cache and still monitored
+    for _ in range(2):
+        at.button[0].click().run()
+        assert not at.exception
+        assert at.success
+    assert monitor.scores()["rows"] == rows + 2
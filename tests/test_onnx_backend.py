@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction.artifacts import APARTMENT_MODEL_FILE, artifact_path
+from prediction.data import APARTMENT_FEATURES, load_apartments
+from prediction.onnx_backend import EQUIVALENCE_TOLERANCE, OnnxPipeline, check_equivalence, onnx_file_name
+from prediction.service import prepare_apartments
+from prediction.validation import APARTMENT_SCHEMA
+from prediction.warmup import synthetic_batch
+
+
+@pytest.fixture(scope="module")
+def reference_frame():
+    """
+    Training rows (with missing construction years and terrace areas) plus
+    served-style rows with unknown ZIP codes and missing categories.
+    """
+    training = load_apartments()[APARTMENT_FEATURES].sample(500, random_state=0)
+    served = prepare_apartments(synthetic_batch(APARTMENT_SCHEMA, 200, seed=1))
+    served.loc[served.index[:20], "heating_type"] = np.nan
+    served.loc[served.index[20:40], "construction_year"] = np.nan
+    return pd.concat([training, served], ignore_index=True)
+
+
+def test_shipped_onnx_model_matches_joblib(apartment_pipeline, reference_frame):
+    path = artifact_path(onnx_file_name(APARTMENT_MODEL_FILE))
+    if not os.path.exists(path):
+        pytest.skip("no exported ONNX model")
+    assert check_equivalence(apartment_pipeline, OnnxPipeline(path), reference_frame) <= EQUIVALENCE_TOLERANCE
+
+
+def test_fresh_export_matches_joblib(apartment_pipeline, reference_frame, tmp_path):
+    pytest.importorskip("skl2onnx")
+    pytest.importorskip("onnxmltools")
+    from prediction.onnx_backend import export_pipeline
+
+    path = tmp_path / "apartments.onnx"
+    path.write_bytes(export_pipeline(apartment_pipeline).SerializeToString())
+    assert check_equivalence(apartment_pipeline, OnnxPipeline(str(path)), reference_frame) <= EQUIVALENCE_TOLERANCE
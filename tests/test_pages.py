@@ -0,0 +1,60 @@
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+
+APARTMENT_PAGE = f"{ROOT}/streamlit/Pages/appartment_prediction.py"
+HOUSE_PAGE = f"{ROOT}/streamlit/Pages/house_prediction.py"
+
+
+@pytest.fixture
+def apartment_page(apartment_pipeline):
+    return AppTest.from_file(APARTMENT_PAGE, default_timeout=60).run()
+
+
+def test_apartment_page_prices_the_default_form(apartment_page):
+    apartment_page.button[0].click().run()
+    assert not apartment_page.exception
+    assert apartment_page.success
+    assert any("€" in markdown.value for markdown in apartment_page.markdown)
+
+
+def test_apartment_page_shows_validation_errors(apartment_page):
+    apartment_page.text_input[0].set_value("0000")
+    apartment_page.button[0].click().run()
+    assert not apartment_page.success
+    assert "ZIP code" in apartment_page.error[0].value
+
+
+def test_apartment_page_counts_its_reruns(apartment_page):
+    assert apartment_page.session_state["reruns_apartment"]["page"] == 1
+    assert apartment_page.session_state["reruns_apartment"]["panel"] == 1
+
+    apartment_page.button[0].click().run()
+    reruns = apartment_page.session_state["reruns_apartment"]
+    # AppTest reruns the whole script; the browser would only rerun the panel
+    assert reruns["page"] == 2
+    assert reruns["panel"] == 2
+    assert reruns["panel_seconds"] > 0
+
+
+def test_house_page_keeps_its_own_rerun_counters():
+    house_page = AppTest.from_file(HOUSE_PAGE, default_timeout=60).run()
+    assert house_page.session_state["reruns_house"]["page"] == 1
+    # Each page has its own key, so switching pages does not mix the counts
+    assert "reruns_apartment" not in house_page.session_state
+
+
+def test_report_tables_of_another_model_version_are_not_shown(monkeypatch):
+    description_page = f"{ROOT}/streamlit/Pages/model_description.py"
+    page = AppTest.from_file(description_page, default_timeout=60).run()
+    assert not page.exception
+    assert not any("not built" in warning.value for warning in page.warning)
+
+    monkeypatch.setattr("prediction.models.model_version", lambda file_name, backend=None: "retrained@000000000000")
+    # The tables are cached per file name across runs
+    st.cache_data.clear()
+    page = AppTest.from_file(description_page, default_timeout=60).run()
+    st.cache_data.clear()
+    assert sum("not built for this model version" in warning.value for warning in page.warning) == 2
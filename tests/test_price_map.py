@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from prediction.data import (
+    APARTMENT_FEATURES,
+    APARTMENT_INPUT_FIELDS,
+    apartment_categories,
+    bucket_categories,
+    load_apartments,
+)
+from prediction.price_map import holdout_comparison, score_zip_codes
+from prediction.service import prepare_apartments, score_apartments
+from prediction.validation import APARTMENT_SCHEMA, valid_rows, validate_batch
+from prediction.warmup import synthetic_batch
+
+
+@pytest.fixture(scope="module")
+def listings():
+    df = load_apartments()
+    return df[valid_rows(validate_batch(df[APARTMENT_INPUT_FIELDS], APARTMENT_SCHEMA))].head(500)
+
+
+def encoder_categories(pipeline, column):
+    _, transformer, columns = next(t for t in pipeline[0].transformers_ if column in t[2])
+    return set(transformer[-1].categories_[list(columns).index(column)])
+
+
+def test_served_provinces_are_training_categories(apartment_pipeline):
+    features = prepare_apartments(synthetic_batch(APARTMENT_SCHEMA, 2000))
+    assert set(features["province"]) <= encoder_categories(apartment_pipeline, "province")
+    assert "Brussels" in set(prepare_apartments(synthetic_batch(APARTMENT_SCHEMA, 1).assign(zip_code="1050"))["province"])
+
+
+def test_serving_path_matches_the_training_features(apartment_pipeline, listings):
+    prices, messages = score_apartments(apartment_pipeline, listings[APARTMENT_INPUT_FIELDS], observers=())
+    assert messages.empty
+    # Training bucketed the rare categories of the listings before fitting
+    features = bucket_categories(listings[APARTMENT_FEATURES], apartment_categories())
+    expected = np.expm1(apartment_pipeline.predict(features))
+    np.testing.assert_allclose(prices, expected, rtol=1e-5)
+
+
+def test_served_categories_are_the_training_vocabulary(apartment_pipeline):
+    for column, kept in apartment_categories().items():
+        assert set(kept) | {"Other"} >= encoder_categories(apartment_pipeline, column)
+
+
+def test_rare_zip_codes_score_like_other(apartment_pipeline):
+    # 8900 (Ypres) is not among the 50 ZIP codes the model was fit on
+    df = synthetic_batch(APARTMENT_SCHEMA, 3).assign(zip_code="8900")
+    assert "8900" not in encoder_categories(apartment_pipeline, "zip_code")
+    features = prepare_apartments(df)
+    assert set(features["zip_code"]) == {"Other"}
+    prices, _ = score_apartments(apartment_pipeline, df, observers=())
+
+    as_other = np.expm1(apartment_pipeline.predict(features.assign(zip_code="Other")))
+    np.testing.assert_allclose(prices, as_other, rtol=1e-6)
+    # Unbucketed, the one-hot encoder would read it as its dropped first ZIP code
+    as_unknown = np.expm1(apartment_pipeline.predict(features.assign(zip_code="8900")))
+    assert not np.allclose(prices, as_unknown)
+
+
+def test_holdout_comparison(apartment_pipeline, listings):
+    comparison = holdout_comparison(apartment_pipeline, listings)
+    assert len(comparison) == 100
+    assert (comparison["absolute_error"] >= 0).all()
+    np.testing.assert_allclose(
+        comparison["percentage_error"], comparison["absolute_error"] / comparison["actual_price"] * 100
+    )
+
+
+def test_price_map_covers_every_known_zip_code(apartment_pipeline):
+    price_map = score_zip_codes(apartment_pipeline)
+    assert len(price_map) > 1000
+    assert price_map["zip_code"].is_unique
+    assert price_map["price"].gt(0).all()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from prediction.router import score_properties
+from prediction.service import score_apartments
+
+
+class Recorder:
+    def __init__(self):
+        self.rows = 0
+
+    def update(self, features, predicted_prices):
+        self.rows += len(features)
+
+
+def test_rows_are_routed_and_returned_in_order(apartment_pipeline, apartment):
+    df = pd.DataFrame([
+        {**apartment, "property_type": "house"},
+        {**apartment, "property_type": " Apartment "},
+        {**apartment, "property_type": None},
+        {**apartment, "property_type": "APARTMENT", "total_area_sqm": 120},
+    ])
+    recorder = Recorder()
+    prices, messages = score_properties(df, {"APARTMENT": apartment_pipeline, "HOUSE": None}, {"APARTMENT": [recorder]})
+
+    expected, _ = score_apartments(apartment_pipeline, df.iloc[[1, 3]].drop(columns="property_type"))
+    np.testing.assert_allclose(prices[[1, 3]], expected)
+    assert np.isnan(prices[[0, 2]]).all()
+    assert messages.to_dict() == {
+        0: "The house model is not available",
+        2: "property_type must be APARTMENT or HOUSE",
+    }
+    assert recorder.rows == 2
+
+
+def test_missing_property_type_column_rejects_every_row(apartment_pipeline, apartments):
+    prices, messages = score_properties(apartments, {"APARTMENT": apartment_pipeline})
+    assert np.isnan(prices).all()
+    assert messages.index.tolist() == [0, 1]
+
+
+def test_validation_errors_keep_the_batch_position(apartment_pipeline, apartment):
+    df = pd.DataFrame([{**apartment, "property_type": "APARTMENT"}, {**apartment, "property_type": "APARTMENT", "nbr_bedrooms": 99}])
+    df.index = [7, 3]
+    prices, messages = score_properties(df, {"APARTMENT": apartment_pipeline})
+    assert prices[0] > 0 and np.isnan(prices[1])
+    assert messages.index.tolist() == [1]
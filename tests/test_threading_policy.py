@@ -0,0 +1,55 @@
+import copy
+import gc
+
+import numpy as np
+
+from prediction.service import prepare_apartments
+from prediction.threading_policy import ThreadingPolicy
+
+
+def test_small_batches_run_on_one_thread():
+    policy = ThreadingPolicy(max_threads=8, single_thread_rows=256, rows_per_thread=2048)
+    assert policy.threads_for(1) == 1
+    assert policy.threads_for(256) == 1
+
+
+def test_large_batches_share_the_cpus_between_active_calls():
+    policy = ThreadingPolicy(max_threads=8, single_thread_rows=256, rows_per_thread=2048)
+    assert policy.threads_for(4096, active=1) == 2
+    assert policy.threads_for(100_000, active=1) == 8
+    assert policy.threads_for(100_000, active=4) == 2
+    assert policy.threads_for(100_000, active=16) == 1
+
+
+def test_track_counts_in_flight_calls():
+    policy = ThreadingPolicy(max_threads=2)
+    with policy.track():
+        with policy.track():
+            assert policy.active == 2
+    assert policy.active == 0
+
+
+def test_boosters_are_cached_per_model_and_thread_count(apartment_pipeline):
+    policy = ThreadingPolicy(max_threads=2)
+    model = apartment_pipeline[-1]
+    assert policy.booster_for(model, 1) is policy.booster_for(model, 1)
+    assert policy.booster_for(model, 1) is not policy.booster_for(model, 2)
+
+    reloaded = copy.deepcopy(model)
+    assert policy.booster_for(reloaded, 1) is not policy.booster_for(model, 1)
+
+
+def test_boosters_are_released_with_their_model(apartment_pipeline):
+    policy = ThreadingPolicy(max_threads=2)
+    model = copy.deepcopy(apartment_pipeline[-1])
+    policy.booster_for(model, 1)
+    assert len(policy._boosters) == 1
+    del model
+    gc.collect()
+    assert len(policy._boosters) == 0
+
+
+def test_predict_matches_the_pipeline(apartment_pipeline, apartments):
+    features = prepare_apartments(apartments)
+    policy = ThreadingPolicy(max_threads=2)
+    np.testing.assert_allclose(policy.predict(apartment_pipeline, features), apartment_pipeline.predict(features))
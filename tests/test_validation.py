@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from prediction.validation import (
+    APARTMENT_SCHEMA,
+    HEATING_TYPE_OPTIONS,
+    STATE_BUILDING_OPTIONS,
+    error_messages,
+    normalize_enum,
+    valid_rows,
+    validate_batch,
+)
+
+
+def test_valid_apartments_pass(apartments):
+    errors = validate_batch(apartments, APARTMENT_SCHEMA)
+    assert valid_rows(errors).all()
+    assert error_messages(errors, APARTMENT_SCHEMA).empty
+
+
+def test_errors_are_reported_per_row_and_field(apartments):
+    apartments.loc[0, "total_area_sqm"] = 5000
+    apartments.loc[1, "zip_code"] = "0042"
+    errors = validate_batch(apartments, APARTMENT_SCHEMA)
+
+    assert not valid_rows(errors).any()
+    assert errors.loc[0, "total_area_sqm"] and not errors.loc[0, "zip_code"]
+    assert errors.loc[1, "zip_code"] and not errors.loc[1, "total_area_sqm"]
+    messages = error_messages(errors, APARTMENT_SCHEMA)
+    assert messages[0] == "total_area_sqm must be between 10 and 500"
+    assert messages[1].startswith("ZIP code is not a known")
+
+
+def test_optional_columns_may_be_missing(apartments):
+    apartments["construction_year"] = np.nan
+    errors = validate_batch(apartments.drop(columns="terrace_sqm"), APARTMENT_SCHEMA)
+    assert valid_rows(errors).all()
+
+
+def test_required_column_missing_rejects_every_row(apartments):
+    errors = validate_batch(apartments.drop(columns="nbr_bedrooms"), APARTMENT_SCHEMA)
+    assert errors["nbr_bedrooms"].all()
+    assert not valid_rows(errors).any()
+
+
+def test_enums_are_normalized_and_flags_checked(apartments):
+    apartments["heating_type"] = [" gas ", "COAL"]
+    apartments["fl_furnished"] = [0, 2]
+    errors = validate_batch(apartments, APARTMENT_SCHEMA)
+    assert valid_rows(errors).tolist() == [True, False]
+    assert errors.loc[1, ["heating_type", "fl_furnished"]].all()
+
+
+def test_messages_keep_the_input_index(apartments):
+    apartments.index = [10, 20]
+    apartments.loc[20, "nbr_bedrooms"] = -1
+    messages = error_messages(validate_batch(apartments, APARTMENT_SCHEMA), APARTMENT_SCHEMA)
+    assert messages.index.tolist() == [20]
+
+
+def test_empty_batch_has_no_messages():
+    empty = pd.DataFrame({"zip_code": pd.Series([], dtype=str), "total_area_sqm": pd.Series([], dtype=float)})
+    messages = error_messages(validate_batch(empty, APARTMENT_SCHEMA), APARTMENT_SCHEMA)
+    assert messages.empty
+
+
+def test_form_labels_map_to_the_training_values(apartment_pipeline, apartments):
+    from prediction.service import prepare_apartments
+
+    encoder = apartment_pipeline[0].named_transformers_["cat"][-1]
+    columns = list(apartment_pipeline[0].transformers_[1][2])
+    for column, options in [("state_building", STATE_BUILDING_OPTIONS), ("heating_type", HEATING_TYPE_OPTIONS)]:
+        df = pd.concat([apartments.head(1)] * len(options), ignore_index=True).assign(**{column: options})
+        assert valid_rows(validate_batch(df, APARTMENT_SCHEMA)).all()
+        known = set(encoder.categories_[columns.index(column)])
+        assert set(prepare_apartments(df)[column]) <= known
+    assert normalize_enum(pd.Series(["New", "just renovated", "Fuel Oil"])).tolist() == ["AS_NEW", "JUST_RENOVATED", "FUELOIL"]
+
+
+def test_values_the_model_never_saw_are_rejected(apartments):
+    apartments["state_building"] = ["OTHER", "TO RENOVATE"]
+    apartments["heating_type"] = ["CENTRAL", "gas"]
+    errors = validate_batch(apartments, APARTMENT_SCHEMA)
+    assert valid_rows(errors).tolist() == [False, True]
+    assert errors.loc[0, ["state_building", "heating_type"]].all()
@@ -0,0 +1,66 @@
+import pytest
+
+from prediction.artifacts import APARTMENT_MODEL_FILE
+from prediction.monitoring import drift_monitors
+from prediction.validation import APARTMENT_SCHEMA, HOUSE_SCHEMA, valid_rows, validate_batch
+from prediction.warmup import Readiness, prometheus_warmup, synthetic_batch, warm_up
+
+
+@pytest.mark.parametrize("schema", [APARTMENT_SCHEMA, HOUSE_SCHEMA])
+def test_synthetic_batches_are_valid(schema):
+    df = synthetic_batch(schema, 200)
+    assert len(df) == 200
+    assert valid_rows(validate_batch(df, schema)).all()
+
+
+def only_apartments(apartment_pipeline):
+    # The house model is optional: a getter returning None skips it
+    return lambda file_name: apartment_pipeline if file_name == APARTMENT_MODEL_FILE else None
+
+
+def test_warm_up_times_each_phase_and_skips_missing_models(apartment_pipeline):
+    monitor = drift_monitors()["APARTMENT"]
+    rows = monitor.scores()["rows"] if monitor is not None else None
+
+    timings = warm_up(only_apartments(apartment_pipeline), batch_sizes=[1, 8])
+    assert {"load apartment model", "apartment predict x1", "apartment predict x8"} <= set(timings)
+    assert not any(phase.startswith("house") or phase == "load house model" for phase in timings)
+    # Synthetic rows stay out of the live drift monitor
+    if monitor is not None:
+        assert monitor.scores()["rows"] == rows
+
+
+def test_readiness_is_set_after_a_successful_warm_up(apartment_pipeline):
+    readiness = Readiness()
+    assert not readiness.ready
+    readiness.start(only_apartments(apartment_pipeline), [1]).join()
+    assert readiness.ready
+    assert readiness.error is None
+    assert "prediction_ready 1" in prometheus_warmup(readiness)
+
+
+def failing_pipeline(file_name):
+    raise RuntimeError("model store unreachable")
+
+
+def test_failed_warm_up_is_not_ready():
+    readiness = Readiness()
+    readiness.start(failing_pipeline, [1]).join()
+    assert not readiness.ready
+    assert isinstance(readiness.error, RuntimeError)
+    text = prometheus_warmup(readiness)
+    assert "prediction_ready 0" in text
+    assert "prediction_warmup_failed 1" in text
+
+
+def test_ready_route_reports_a_failed_warm_up(api_client, monkeypatch):
+    import app
+
+    readiness = Readiness()
+    readiness.start(failing_pipeline, [1]).join()
+    monkeypatch.setattr(app, "readiness", readiness)
+
+    response = api_client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+    assert response.json()["error"] == "RuntimeError: model store unreachable"
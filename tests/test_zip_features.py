@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from prediction import service, zip_features
+from prediction.service import score_apartments, wants_zip_features
+from prediction.zip_codes import zip_code_index
+from prediction.zip_features import ZIP_FEATURE_COLUMNS, attach_zip_features, build_zip_features
+
+
+class Recorder:
+    def update(self, features, predicted_prices):
+        self.features = features
+
+
+def listings():
+    return pd.DataFrame({
+        "zip_code": ["1000", "1000", "1000", "1050", "2000"],
+        "total_area_sqm": [100, 50, 100, 100, 0],
+        "price": [300_000, 200_000, 500_000, 250_000, 100_000],
+    })
+
+
+def test_build_aggregates_listings_per_zip_code():
+    features = build_zip_features(listings(), neighbors=1, prior_weight=1)
+    brussels, ixelles, antwerp = zip_code_index(pd.Series(["1000", "1050", "2000"]))
+
+    assert features[brussels, 0] == 4000
+    assert features[brussels, 1] == 3
+    # Listings without an area are left out
+    assert features[antwerp, 1] == 0
+    # The only other ZIP with listings is the neighbour average of each
+    assert features[brussels, 2] == 2500 and features[ixelles, 2] == 4000
+    assert features[brussels, 3] == (3 * 4000 + 2500) / 4
+    # A ZIP without listings falls back to its neighbours
+    assert features[antwerp, 3] == features[antwerp, 2]
+
+
+def test_attach_adds_the_columns_and_nan_for_malformed_zip_codes():
+    features = build_zip_features(listings(), neighbors=1)
+    df = attach_zip_features(pd.DataFrame({"zip_code": ["1000", "abc"]}), features)
+    assert list(df.columns) == ["zip_code"] + ZIP_FEATURE_COLUMNS
+    assert df.loc[0, "zip_median_price_sqm"] == 4000
+    assert df.loc[1, ZIP_FEATURE_COLUMNS].isna().all()
+
+
+def test_serving_attaches_the_features_behind_the_flag(monkeypatch, apartment_pipeline, apartments):
+    plain = Recorder()
+    prices, _ = score_apartments(apartment_pipeline, apartments, observers=[plain])
+    assert not set(ZIP_FEATURE_COLUMNS) & set(plain.features.columns)
+
+    monkeypatch.setattr(service, "ATTACH_ZIP_FEATURES", True)
+    enriched = Recorder()
+    enriched_prices, _ = score_apartments(apartment_pipeline, apartments, observers=[enriched])
+    assert set(ZIP_FEATURE_COLUMNS) <= set(enriched.features.columns)
+    # The shipped pipeline ignores the extra columns
+    np.testing.assert_array_equal(prices, enriched_prices)
+
+
+def test_pipelines_trained_with_the_features_always_get_them():
+    class Trained:
+        feature_names_in_ = np.array(["total_area_sqm", "zip_smoothed_price_sqm"])
+
+    assert wants_zip_features(Trained())
+    assert not wants_zip_features(object())
+
+
+def test_main_leaves_the_held_out_split_out(tmp_path, monkeypatch):
+    df = listings()
+    monkeypatch.setattr(zip_features, "load_apartments", lambda: df)
+    monkeypatch.setattr(zip_features, "split_apartments", lambda df: (df.head(3), df.tail(2)))
+    for flags, count in [([], 3), (["--all-rows"], 4)]:
+        output = str(tmp_path / f"zip_features{len(flags)}.npz")
+        monkeypatch.setattr("sys.argv", ["zip_features", "--output", output, *flags])
+        zip_features.main()
+        assert zip_features.load_zip_features(output)[:, 1].sum() == count